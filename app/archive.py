@@ -0,0 +1,79 @@
+import os
+import threading
+
+import config
+
+
+def archive_path(setting):
+    # True uses the built-in location, a string points at an existing yt-dlp archive, False disables it.
+    if setting is True:
+        return os.path.join(config.data_dir(), "archive.txt")
+    if isinstance(setting, str) and setting:
+        return os.path.expanduser(setting)
+    return None
+
+
+def archive_id(extractor, video_id):
+    # Same "<extractor> <id>" line yt-dlp writes for --download-archive.
+    if not extractor or not video_id:
+        return None
+    return f"{extractor.lower()} {video_id}"
+
+
+def info_archive_id(info):
+    return archive_id(info.get("extractor_key") or info.get("ie_key"), info.get("id"))
+
+
+def record_archive_id(path, entry_id):
+    # For downloads that bypass yt-dlp, which otherwise appends the line itself.
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(entry_id + "\n")
+    except OSError:
+        pass
+
+
+class DownloadArchive:
+    # In-memory set mirror of a yt-dlp download archive. yt-dlp appends to the
+    # file itself (build_download_cmd passes --download-archive), so the set is
+    # re-read whenever the file changes on disk.
+
+    def __init__(self, path):
+        self.path = path
+        # yt-dlp creates the file but not its directory.
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        except OSError:
+            pass
+        self._ids = set()
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._ids = set()
+            self._stamp = None
+            return
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return
+        ids = set()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        ids.add(line)
+        except OSError:
+            return
+        self._ids = ids
+        self._stamp = stamp
+
+    def __contains__(self, entry_id):
+        if not entry_id:
+            return False
+        with self._lock:
+            self._refresh()
+            return entry_id in self._ids
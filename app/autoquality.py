@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from progress import format_bytes, format_eta
+
+
+def choose_quality(choices, throughput=None, max_seconds=None, max_bytes=None):
+    # Highest quality whose estimate fits the byte budget and, when the speed is known,
+    # the time budget. Nothing fits: the smallest known size. No sizes at all: None.
+    sized = [choice for choice in choices if choice["size"]]
+    for choice in sized:
+        if max_bytes and choice["size"] > max_bytes:
+            continue
+        if max_seconds and throughput and choice["size"] / throughput > max_seconds:
+            continue
+        return choice
+    if sized:
+        return min(sized, key=lambda choice: choice["size"])
+    return None
+
+
+def describe_estimate(size, throughput=None):
+    if not size:
+        return ""
+    text = f"~{format_bytes(size)}"
+    if throughput:
+        text += f" \u2022 {format_eta(size / throughput)}"
+    return text
+
+
+class ThroughputLog:
+    # Average speeds of recent finished downloads, per host, kept across restarts.
+
+    def __init__(self, path, keep=30):
+        self.path = path
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._samples = None
+
+    def _load(self):
+        if self._samples is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._samples = [sample for sample in json.load(f) if len(sample) == 3]
+            except (OSError, ValueError, TypeError):
+                self._samples = []
+        return self._samples
+
+    def _save(self):
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # A temp name per writer: the GUI and a --batch run can share the file.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._samples, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def record(self, host, stats):
+        # stats comes from downloader.run_download; a few seconds of samples are needed. A
+        # download that ran under a speed limit says nothing about what the site can deliver.
+        if not stats or not stats["speed_samples"] or time.monotonic() - stats["started"] < 3:
+            return
+        if stats["limited"]:
+            return
+        speed = stats["speed_sum"] / stats["speed_samples"]
+        with self._lock:
+            samples = self._load()
+            samples.append([host or "", speed, int(time.time())])
+            del samples[:-self.keep]
+            self._save()
+
+    def estimate(self, host=None):
+        # Median speed for the host, or across all hosts when it has no samples yet.
+        with self._lock:
+            samples = self._load()
+            speeds = [speed for sample_host, speed, _at in samples if sample_host == host]
+            if not speeds:
+                speeds = [speed for _host, speed, _at in samples]
+        if not speeds:
+            return None
+        speeds.sort()
+        middle = len(speeds) // 2
+        return speeds[middle] if len(speeds) % 2 else (speeds[middle - 1] + speeds[middle]) / 2
@@ -0,0 +1,119 @@
+import re
+import threading
+import time
+from datetime import datetime
+
+
+RATE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?(?:/s)?\s*$", re.IGNORECASE)
+UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_rate(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    match = RATE_RE.match(value)
+    if not match:
+        return None
+    rate = float(match.group(1)) * UNITS[match.group(2).upper()]
+    return rate if rate > 0 else None
+
+
+def _minutes(value):
+    hours, _, minutes = value.partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def _in_window(window, minute):
+    start = _minutes(window["start"])
+    end = _minutes(window["end"])
+    if start <= end:
+        return start <= minute < end
+    # Windows such as 22:00-06:00 wrap past midnight.
+    return minute >= start or minute < end
+
+
+class BandwidthBudget:
+    # One rate budget shared by every active download. The schedule lists
+    # peak windows ({"start": "08:00", "end": "23:00", "limit": "2M"}) that cap
+    # the budget; outside them the manual limit (or full speed) applies.
+
+    def __init__(self, total=None, schedule=None):
+        self.total = parse_rate(total)
+        self.schedule = []
+        for window in schedule or []:
+            try:
+                _minutes(window["start"])
+                _minutes(window["end"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.schedule.append(window)
+
+    def total_at(self, now=None):
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        total = self.total
+        for window in self.schedule:
+            if not _in_window(window, minute):
+                continue
+            limit = parse_rate(window.get("limit"))
+            if limit and (total is None or limit < total):
+                total = limit
+        return total
+
+    def next_change(self, now=None):
+        # Seconds until a peak window opens or closes, or None without a schedule.
+        if not self.schedule:
+            return None
+        now = now or datetime.now()
+        second = now.hour * 3600 + now.minute * 60 + now.second
+        waits = []
+        for window in self.schedule:
+            for edge in (window["start"], window["end"]):
+                waits.append((_minutes(edge) * 60 - second) % 86400 or 86400)
+        return min(waits)
+
+    def share(self, concurrency, now=None):
+        total = self.total_at(now)
+        if total is None:
+            return None
+        return total / max(1, concurrency)
+
+    def limit_arg(self, concurrency, now=None):
+        rate = self.share(concurrency, now)
+        if rate is None:
+            return None
+        # Plain bytes per second is what yt-dlp's --limit-rate parses most precisely.
+        return str(max(1024, int(rate)))
+
+
+class RateLimiter:
+    # Token bucket for the in-process ranged downloader. Every range of one download draws
+    # from it, and its rate can be changed while they run.
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self.available = 0.0
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self.lock:
+            self.rate = rate
+
+    def consume(self, count, cancel=None):
+        with self.lock:
+            rate = self.rate
+            if not rate:
+                return
+            now = time.monotonic()
+            # At most a second of unused allowance carries over, so an idle spell cannot burst.
+            self.available = min(rate, self.available + (now - self.last) * rate) - count
+            self.last = now
+            delay = -self.available / rate if self.available < 0 else 0
+        if delay > 0:
+            if cancel is not None:
+                cancel.wait(delay)
+            else:
+                time.sleep(delay)
@@ -0,0 +1,266 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+import config
+from archive import DownloadArchive, archive_id, archive_path
+from bandwidth import BandwidthBudget
+from downloader import backoff_delay, classify_error, item_key, new_queue_item, run_download, set_speed_limit
+from engine import FetchError, InfoEngine
+from formats import FormatTable
+from playlist import looks_like_playlist
+from presets import BULK_PRESETS, find_preset
+from progress import format_bytes
+from scheduler import DownloadScheduler
+from tuning import FragmentTuner, tuning_key
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="glassdrop",
+        description="Download a list of URLs with the GlassDrop engine, without starting the GUI."
+    )
+    parser.add_argument("--batch", metavar="FILE", required=True,
+                        help="file with one URL per line, or - for stdin")
+    parser.add_argument("--preset", default="Best Video + Audio",
+                        help="preset label applied to every URL (default: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="parallel downloads (default: max_concurrent_downloads setting)")
+    parser.add_argument("--per-host", type=int, default=None,
+                        help="parallel downloads per site (default: --jobs if given, "
+                             "else max_downloads_per_host setting)")
+    parser.add_argument("--limit-rate", metavar="RATE", default=None,
+                        help="total speed budget shared by all downloads, e.g. 5M")
+    parser.add_argument("-N", "--connections", default=None,
+                        help="parallel connections per download, or auto (default: download_connections setting)")
+    parser.add_argument("--list-formats", action="store_true",
+                        help="print the format table for each URL instead of downloading")
+    return parser
+
+
+def read_urls(path):
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with stream:
+        lines = [line.strip() for line in stream]
+    return [line for line in lines if line.startswith("http")]
+
+
+class BatchRunner:
+
+    def __init__(self, settings, preset, jobs, per_host, limit_rate, connections=None):
+        self.engine = InfoEngine(settings.get("fetch_engine", "auto"))
+        self.preset = preset
+        # Batch lists are often one site's playlist, so an explicit -j is not quietly held to
+        # the GUI's per-site limit; --per-host still sets one.
+        self.scheduler = DownloadScheduler(
+            max_active=jobs or settings.get("max_concurrent_downloads", 3),
+            max_per_host=per_host or jobs or settings.get("max_downloads_per_host", 2),
+        )
+        self.bandwidth = BandwidthBudget(limit_rate, settings.get("bandwidth_schedule"))
+        if connections:
+            settings = dict(settings, download_connections=connections)
+        self.connections = config.connections_setting(settings)
+        self.tuner = FragmentTuner(os.path.join(config.data_dir(), "fragment_tuning.json"))
+        self.max_retries = settings.get("download_retries", 4)
+        self.archive_path = archive_path(settings.get("download_archive", True))
+        self.archive = DownloadArchive(self.archive_path) if self.archive_path else None
+        self.queue = []
+        self.keys = set()
+        self.results = []
+        self.total = 0
+        self.skipped = 0
+        self.producing = True
+        self.rebalance_in = None
+        self.cond = threading.Condition()
+        self.print_lock = threading.Lock()
+
+    def log(self, text):
+        with self.print_lock:
+            print(text, flush=True)
+
+    def enqueue(self, url, title, entry_id=None):
+        item = new_queue_item(
+            url,
+            None,
+            title,
+            self.preset["label"],
+            format_selector=self.preset.get("format"),
+            post_args=self.preset.get("post"),
+            archive_id=entry_id,
+            archive_path=self.archive_path
+        )
+        # Playlist entries carry their ID, so archived ones are skipped without starting yt-dlp;
+        # single URLs are left to yt-dlp's own --download-archive check.
+        if self.archive is not None and entry_id in self.archive:
+            self.log(f"Skipped (already downloaded): {title}")
+            with self.cond:
+                self.skipped += 1
+            return
+        with self.cond:
+            key = item_key(item)
+            if key in self.keys:
+                self.skipped += 1
+                return
+            self.keys.add(key)
+            self.total += 1
+            item["number"] = self.total
+            self.queue.append(item)
+            self.cond.notify()
+
+    def produce(self, urls):
+        # Playlists are streamed entry by entry so downloads start before the listing finishes.
+        try:
+            for url in urls:
+                if not looks_like_playlist(url):
+                    self.enqueue(url, url)
+                    continue
+                listed = 0
+                try:
+                    for entry in self.engine.iter_playlist(url):
+                        self.enqueue(
+                            entry["url"],
+                            entry.get("title") or entry["url"],
+                            archive_id(entry.get("ie_key"), entry.get("id"))
+                        )
+                        listed += 1
+                except FetchError as e:
+                    self.log(f"Playlist failed after {listed} entries: {url}\n  {e}")
+                    with self.cond:
+                        self.results.append((url, False, str(e)))
+        finally:
+            with self.cond:
+                self.producing = False
+                self.cond.notify()
+
+    def start_ready(self):
+        started = []
+        while self.queue:
+            index = self.scheduler.pick(self.queue)
+            if index is None:
+                break
+            item = self.queue.pop(index)
+            self.scheduler.start(item)
+            # Auto only tunes DASH/HLS fragment concurrency; plain files stay on one stream.
+            item["tuned"] = self.connections == "auto"
+            item["connections"] = (
+                self.tuner.suggest(tuning_key(item)) if item["tuned"] else self.connections
+            )
+            started.append(item)
+        self.rebalance()
+        for item in started:
+            threading.Thread(target=self.download, args=(item,), daemon=True).start()
+
+    def rebalance(self):
+        # Even shares of the budget over the running downloads. Runs on every pass of the
+        # main loop, so finished downloads and peak-window changes are picked up.
+        # A restart held back by set_speed_limit() is retried once it is allowed.
+        limit = self.bandwidth.limit_arg(len(self.scheduler.active))
+        waits = [set_speed_limit(item, limit) for item in self.scheduler.active]
+        waits = [wait for wait in waits if wait is not None]
+        self.rebalance_in = min(waits) if waits else None
+
+    def download(self, item):
+        self.log(f"[{item['number']}] Downloading {item['title']}")
+        last_report = [0.0]
+
+        def on_progress(event):
+            now = time.monotonic()
+            if now - last_report[0] < 5 and event.status != "finished":
+                return
+            last_report[0] = now
+            parts = event.summary()
+            if event.total:
+                parts.append(f"of {format_bytes(event.total)}")
+            self.log(f"[{item['number']}] " + " ".join(parts))
+
+        try:
+            returncode, dest_path, error_tail = run_download(item, None, on_progress)
+            if self.connections == "auto":
+                self.tuner.record(tuning_key(item), item["connections"], item.get("stats"))
+        except OSError as e:
+            returncode, dest_path, error_tail = 1, None, [str(e)]
+        ok = returncode == 0
+        kind = None if ok else classify_error(error_tail)
+        # Batch items have no saved info document, so an expired URL is just retried (yt-dlp re-extracts).
+        if kind in ("transient", "throttled", "expired") and item.get("attempts", 0) < self.max_retries:
+            item["attempts"] = item.get("attempts", 0) + 1
+            delay = backoff_delay(item["attempts"])
+            self.log(f"[{item['number']}] {kind.capitalize()} error, retry {item['attempts']} in {delay:.0f}s")
+            with self.cond:
+                if kind == "throttled":
+                    self.scheduler.cooldown(item["host"], delay)
+                item["not_before"] = time.monotonic() + delay
+                self.scheduler.finish(item)
+                self.queue.insert(0, item)
+                self.cond.notify()
+            return
+        if ok:
+            self.log(f"[{item['number']}] Done: {dest_path or item['title']}")
+        else:
+            detail = error_tail[-1] if error_tail else "Download failed."
+            self.log(f"[{item['number']}] Failed: {item['title']}\n  {detail}")
+        with self.cond:
+            self.results.append((item["url"], ok, None if ok else "\n".join(error_tail)))
+            self.scheduler.finish(item)
+            self.cond.notify()
+
+    def run(self, urls):
+        threading.Thread(target=self.produce, args=(urls,), daemon=True).start()
+        with self.cond:
+            while self.producing or self.queue or self.scheduler.active:
+                self.start_ready()
+                waits = [self.scheduler.next_ready_in(self.queue), self.rebalance_in]
+                if self.scheduler.active and self.bandwidth.next_change() is not None:
+                    waits.append(self.bandwidth.next_change() + 1)
+                waits = [wait for wait in waits if wait is not None]
+                self.cond.wait(min(waits) if waits else None)
+        failed = [url for url, ok, _error in self.results if not ok]
+        self.log(
+            f"Finished: {len(self.results) - len(failed)} done, {len(failed)} failed, "
+            f"{self.skipped} skipped"
+        )
+        for url in failed:
+            self.log(f"  failed: {url}")
+        return 1 if failed else 0
+
+
+def list_formats(engine, urls):
+    status = 0
+    for url in urls:
+        try:
+            info = engine.extract_info(url)
+        except FetchError as e:
+            print(f"{url}\n  fetch failed: {e}")
+            status = 1
+            continue
+        print(f"{info.get('title') or url}\n  {url}")
+        for label, format_id in FormatTable(info.get("formats") or []).items():
+            print(f"  {format_id:>12}  {label}")
+    return status
+
+
+def run_batch(argv, started):
+    args = build_parser().parse_args(argv)
+    preset = find_preset(args.preset, BULK_PRESETS)
+    if preset is None:
+        labels = ", ".join(f'"{p["label"]}"' for p in BULK_PRESETS)
+        print(f"Unknown preset {args.preset!r}. Choose one of: {labels}", file=sys.stderr)
+        return 2
+    try:
+        urls = read_urls(args.batch)
+    except OSError as e:
+        print(f"Cannot read {args.batch}: {e}", file=sys.stderr)
+        return 2
+
+    settings = config.load_settings()
+    print(
+        f"glassdrop: engine ready in {(time.perf_counter() - started) * 1000:.0f} ms "
+        f"(GTK not loaded), {len(urls)} URLs",
+        file=sys.stderr
+    )
+    if args.list_formats:
+        return list_formats(InfoEngine(settings.get("fetch_engine", "auto")), urls)
+    runner = BatchRunner(settings, preset, args.jobs, args.per_host, args.limit_rate, args.connections)
+    return runner.run(urls)
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+INFO_KEYS = (
+    "id", "title", "thumbnail", "webpage_url", "extractor", "extractor_key",
+    "duration", "_type",
+)
+FORMAT_KEYS = (
+    "format_id", "ext", "height", "width", "fps", "vcodec", "acodec",
+    "tbr", "abr", "vbr", "filesize", "filesize_approx", "protocol", "format_note",
+)
+TRACKING_PARAMS = ("si", "feature", "pp", "fbclid", "gclid", "igshid")
+EXPIRE_RE = re.compile(r"[?&/]expire[=/](\d{9,11})")
+
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    path = parts.path.rstrip("/") or "/"
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+    if host == "youtu.be" and path != "/":
+        query.append(("v", path.lstrip("/")))
+        host, path = "youtube.com", "/watch"
+    query.sort()
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def url_key(url):
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def stream_expiry(info):
+    # Signed stream URLs (YouTube and friends) carry their expiry as an "expire" parameter.
+    expiries = []
+    for f in info.get("formats") or []:
+        for key in ("url", "manifest_url", "fragment_base_url"):
+            value = f.get(key)
+            if not value:
+                continue
+            match = EXPIRE_RE.search(value)
+            if match:
+                expiries.append(int(match.group(1)))
+                break
+    return min(expiries) if expiries else None
+
+
+def trim_info(info):
+    trimmed = {key: info[key] for key in INFO_KEYS if info.get(key) is not None}
+    trimmed["formats"] = [
+        {key: f[key] for key in FORMAT_KEYS if f.get(key) is not None}
+        for f in info.get("formats") or []
+    ]
+    return trimmed
+
+
+class InfoCache:
+
+    def __init__(self, directory, ttl=3600, max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def _path(self, url):
+        return os.path.join(self.directory, f"{url_key(url)}.json")
+
+    def get(self, url, allow_stale=False):
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception:
+            return None, False
+        fresh = time.time() - entry.get("fetched", 0) < self.ttl
+        if not fresh and not allow_stale:
+            return None, False
+        try:
+            # mtime doubles as the LRU clock; "fetched" inside the entry drives the TTL.
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("info"), fresh
+
+    def put(self, url, info):
+        trimmed = trim_info(info)
+        entry = {"url": normalize_url(url), "fetched": time.time(), "info": trimmed}
+        path = self._path(url)
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # A temp name per writer: a refresh and a foreground fetch can store the same URL at once.
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return trimmed
+        self.evict()
+        return trimmed
+
+    def evict(self):
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+class InfoJsonStore:
+    # Full info documents (with stream URLs) for yt-dlp --load-info-json.
+    # Each file's mtime is set to the moment its stream URLs stop being usable.
+
+    def __init__(self, directory, max_age=1800, margin=300):
+        self.directory = directory
+        self.max_age = max_age
+        self.margin = margin
+
+    def _path(self, url):
+        return os.path.join(self.directory, f"{url_key(url)}.info.json")
+
+    def save(self, url, info):
+        now = time.time()
+        expires = now + self.max_age
+        expiry = stream_expiry(info)
+        if expiry is not None:
+            expires = min(expires, expiry)
+        path = self._path(url)
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(info, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+            os.utime(path, (now, expires))
+        except (OSError, TypeError, ValueError):
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return None
+        self.prune()
+        return path
+
+    def lookup(self, url):
+        path = self._path(url)
+        try:
+            expires = os.stat(path).st_mtime
+        except OSError:
+            return None
+        if expires - self.margin <= time.time():
+            return None
+        return path
+
+    def discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def prune(self):
+        now = time.time()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".info.json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime <= now:
+                    os.remove(path)
+            except OSError:
+                continue
@@ -0,0 +1,90 @@
+import json
+import os
+
+
+DEFAULTS = {
+    # "auto" uses an in-process yt-dlp when the module is importable,
+    # "subprocess" always spawns the yt-dlp binary.
+    "fetch_engine": "auto",
+    # Metadata cache: entries younger than the TTL skip extraction entirely;
+    # older ones are shown immediately and refreshed in the background.
+    "info_cache_ttl": 3600,
+    "info_cache_max_mb": 50,
+    "info_cache_stale_while_revalidate": True,
+    # Full info documents are handed to the downloader until their stream URLs
+    # expire (or this many seconds pass, for sites that do not say).
+    "info_json_max_age": 1800,
+    # Download slots in total and per site.
+    "max_concurrent_downloads": 3,
+    "max_downloads_per_host": 2,
+    # Peak windows that cap the shared speed budget, e.g.
+    # [{"start": "08:00", "end": "23:00", "limit": "2M"}].
+    "bandwidth_schedule": [],
+    # Upper bound on how often queued progress/status updates are applied to widgets.
+    "ui_refresh_hz": 20,
+    # Playlist entries listed individually before the rest are summarised as a count.
+    "playlist_preview_rows": 200,
+    "thumbnail_cache_max_mb": 100,
+    # yt-dlp --download-archive file used to skip media that was already downloaded:
+    # true for ~/.local/share/glassdrop/archive.txt, a path to share an existing one, false to disable.
+    "download_archive": True,
+    # Parallel ffmpeg jobs for MP3/M4A conversion after download; null uses one per CPU core.
+    "postprocess_workers": None,
+    # Connections per download (the dropdown next to the speed limit starts here). 1 keeps
+    # accelerated mode off; "auto" tunes DASH/HLS fragment concurrency per site between
+    # downloads and leaves plain HTTP files on one connection.
+    "download_connections": 1,
+    # Retries for failures that look temporary (timeouts, resets, 5xx, 429), with growing,
+    # jittered delays; a 429 also pauses new downloads from that site for the same delay.
+    "download_retries": 4,
+    # Metadata fetches run at once when several links are pasted or dropped, overall and per site.
+    "metadata_workers": 4,
+    "metadata_per_host": 2,
+    # Budgets for the "Auto (fits budget)" preset: the highest quality whose estimated size
+    # downloads within this many minutes at recently measured speeds, and/or fits this many MB.
+    "auto_quality_minutes": 10,
+    "auto_quality_max_mb": None,
+}
+
+
+def _xdg_dir(env_name, fallback):
+    base = os.environ.get(env_name) or os.path.join(os.path.expanduser("~"), fallback)
+    return os.path.join(base, "glassdrop")
+
+
+# Same locations as GLib.get_user_*_dir() so this works without importing gi.
+def config_dir():
+    return _xdg_dir("XDG_CONFIG_HOME", ".config")
+
+
+def cache_dir():
+    return _xdg_dir("XDG_CACHE_HOME", ".cache")
+
+
+def data_dir():
+    return _xdg_dir("XDG_DATA_HOME", os.path.join(".local", "share"))
+
+
+def connections_setting(settings):
+    value = settings.get("download_connections", 1)
+    if value == "auto":
+        return value
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+def load_settings():
+    settings = dict(DEFAULTS)
+    path = os.path.join(config_dir(), "settings.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except Exception:
+        return settings
+    if isinstance(stored, dict):
+        for key, value in stored.items():
+            if key in settings:
+                settings[key] = value
+    return settings
@@ -0,0 +1,50 @@
+import itertools
+import threading
+import traceback
+
+from gi.repository import GLib
+
+
+class UiDispatcher:
+    # Worker threads post UI work here instead of calling GLib.idle_add directly.
+    # post() keeps only the latest call per key, call() keeps every call in order,
+    # and everything pending runs from a single timer tick at most `hz` times a second.
+
+    def __init__(self, token_source, hz=20):
+        self.token_source = token_source
+        self.interval_ms = max(1, int(1000 / max(1, hz)))
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._source_id = None
+        self._counter = itertools.count()
+
+    def post(self, key, func, *args, token=None):
+        with self._lock:
+            # Re-inserting moves the key to the end so it still runs after anything posted before it.
+            self._pending.pop(key, None)
+            self._pending[key] = (token, func, args)
+            self._schedule()
+
+    def call(self, func, *args, token=None):
+        with self._lock:
+            self._pending[("call", next(self._counter))] = (token, func, args)
+            self._schedule()
+
+    def _schedule(self):
+        if self._source_id is None:
+            self._source_id = GLib.timeout_add(self.interval_ms, self._flush)
+
+    def _flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._source_id = None
+        current = self.token_source()
+        for token, func, args in pending.values():
+            if token is not None and token != current:
+                continue
+            try:
+                func(*args)
+            except Exception:
+                traceback.print_exc()
+        return False
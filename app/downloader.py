@@ -0,0 +1,368 @@
+import json
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from archive import record_archive_id
+from bandwidth import RateLimiter, parse_rate
+from cache import EXPIRE_RE, normalize_url, stream_expiry
+from engine import FetchCancelled, FetchError, yt_dlp_base_cmd
+from postprocess import strip_audio_args
+from progress import parse_filepath, parse_progress, progress_args
+from tuning import is_throttle_line
+
+
+# Matched against yt-dlp's "ERROR:" and "Got error:" retry lines (or the ranged downloader's
+# urllib errors), in the forms urllib and yt-dlp print: "HTTP Error 429: Too Many Requests",
+# "HTTP Error 410: Gone".
+EXPIRED_MARKERS = ("HTTP Error 410",)
+FORBIDDEN_MARKER = "HTTP Error 403"
+THROTTLED_MARKERS = ("HTTP Error 429", "Too Many Requests")
+TRANSIENT_MARKERS = (
+    "HTTP Error 500", "HTTP Error 502", "HTTP Error 503", "HTTP Error 504",
+    "Connection reset", "Connection refused", "Connection aborted", "timed out",
+    "Temporary failure in name resolution", "Name or service not known",
+    "No address associated with hostname", "nodename nor servname provided", "getaddrinfo failed",
+    "Network is unreachable", "IncompleteRead", "Remote end closed connection",
+    # A fragment that stayed missing after yt-dlp's own retries: the server or network failed.
+    "not found, unable to continue",
+)
+
+# A running yt-dlp process only gets a new --limit-rate by being restarted, so set_speed_limit()
+# restarts it when its share falls below RESTART_DROP of the running rate or rises past
+# RESTART_RISE times it, and at most once per RESTART_INTERVAL seconds.
+RESTART_DROP = 0.75
+RESTART_RISE = 2.0
+RESTART_INTERVAL = 30
+
+# Guards item["process"], item["limiter"] and the limit they were started with.
+_process_lock = threading.Lock()
+
+
+def new_queue_item(url, format_id, title, format_label, format_selector=None, post_args=None,
+                   thumbnail=None, info_path=None, directory=None, archive_id=None, archive_path=None):
+    return {
+        "url": url,
+        "format_id": format_id,
+        "format_selector": format_selector,
+        "format_label": format_label,
+        "title": title,
+        "thumbnail": thumbnail,
+        "process": None,
+        "fraction": 0.0,
+        "speed_limit": None,
+        "post_args": post_args,
+        "info_path": info_path,
+        "directory": directory,
+        "archive_id": archive_id,
+        "archive_path": archive_path,
+        "post_job": None,
+        "connections": 1,
+    }
+
+
+def item_key(item):
+    # Two items with this key would produce the same file.
+    return (
+        normalize_url(item["url"]),
+        item.get("format_id") or item.get("format_selector"),
+        tuple(item.get("post_args") or ()),
+    )
+
+
+def aria2c_available():
+    # Inside Flatpak yt-dlp runs on the host, where we cannot tell whether aria2c exists.
+    return not os.environ.get("FLATPAK_ID") and shutil.which("aria2c") is not None
+
+
+def build_download_cmd(item, info_path=None, info_out=None):
+    format_id = item.get("format_id")
+    format_selector = item.get("format_selector")
+    speed_limit = item.get("speed_limit")
+    post_args = item.get("post_args") or []
+    if item.get("post_job"):
+        # The conversion runs later in the post-processing pool, not inside this yt-dlp run.
+        post_args = strip_audio_args(post_args)
+    directory = item.get("directory")
+    archive_path = item.get("archive_path")
+    connections = int(item.get("connections") or 1)
+
+    cmd = yt_dlp_base_cmd() + progress_args()
+    if format_id:
+        cmd.extend(["-f", format_id])
+    elif format_selector:
+        cmd.extend(["-f", format_selector])
+    if speed_limit:
+        cmd.extend(["--limit-rate", speed_limit])
+    if connections > 1:
+        # -N fetches DASH/HLS fragments concurrently; aria2c splits plain HTTP files into ranges,
+        # unless the count came from the fragment tuner.
+        cmd.extend(["-N", str(connections)])
+        if aria2c_available() and not item.get("tuned"):
+            cmd.extend([
+                "--downloader", "aria2c",
+                "--downloader", "dash,m3u8:native",
+                "--downloader-args", f"aria2c:-x{connections} -s{connections} -k1M",
+            ])
+    if post_args:
+        cmd.extend(post_args)
+    if directory:
+        # A fixed directory lets a resumed download find its .part file after a restart.
+        cmd.extend(["-P", directory])
+    if archive_path and not (item.get("post_job") and item.get("archive_id")):
+        # With a conversion still to run, yt-dlp would archive the item before it is converted;
+        # the GUI writes the entry itself once the conversion succeeds.
+        cmd.extend(["--download-archive", archive_path])
+    if info_out:
+        # Keep the extracted document, so a restart does not have to read the page again.
+        cmd.extend(["--write-info-json", "-o", f"infojson:{info_out}"])
+    if info_path:
+        # Reuse the document from the metadata fetch instead of re-extracting the page.
+        cmd.extend(["--load-info-json", info_path])
+    else:
+        cmd.append(item["url"])
+    return cmd
+
+
+def _error_text(lines):
+    # Progress chatter and titles can contain anything; yt-dlp's verdict is on its ERROR: lines,
+    # and the cause behind a final "fragment ... not found" on the "Got error:" retries before it.
+    errors = [line for line in lines if line.startswith("ERROR:") or "] Got error:" in line]
+    return "\n".join(errors or lines)
+
+
+def info_expiry(info_path):
+    # Earliest expire= timestamp among the signed stream URLs of a saved info document.
+    if not info_path:
+        return None
+    try:
+        with open(info_path, "r", encoding="utf-8") as f:
+            return stream_expiry(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+def is_expired_stream_error(lines, expires_at=None):
+    text = _error_text(lines)
+    if any(marker in text for marker in EXPIRED_MARKERS):
+        return True
+    if FORBIDDEN_MARKER not in text:
+        return False
+    # A 403 means stale URLs only once their signed expiry has passed; any other 403
+    # (private, geo-blocked, members only) would fail the same way after a refresh.
+    if expires_at is None:
+        match = EXPIRE_RE.search(text)
+        expires_at = int(match.group(1)) if match else None
+    return expires_at is not None and expires_at <= time.time()
+
+
+def classify_error(lines, expires_at=None):
+    # "throttled" and "transient" are worth retrying later, "expired" needs fresh stream URLs,
+    # anything unrecognised (private, removed, unsupported...) is "permanent". expires_at is
+    # the stream URLs' expiry (info_expiry), when the download used a saved info document.
+    text = _error_text(lines)
+    if any(marker in text for marker in THROTTLED_MARKERS):
+        return "throttled"
+    if is_expired_stream_error(lines, expires_at):
+        return "expired"
+    if any(marker in text for marker in TRANSIENT_MARKERS):
+        return "transient"
+    return "permanent"
+
+
+def backoff_delay(attempt, base=5, cap=300):
+    # Exponential with jitter, so items that failed together do not all come back together.
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def segmented_format(item, info_path):
+    # The built-in ranged downloader only handles one direct http(s) format picked by ID from a
+    # saved info document; selectors, merges and post-processing stay with yt-dlp.
+    format_id = item.get("format_id")
+    if not info_path or not format_id or "+" in format_id or item.get("post_args"):
+        return None
+    try:
+        with open(info_path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    for fmt in info.get("formats") or []:
+        if fmt.get("format_id") == format_id:
+            if fmt.get("protocol") in ("http", "https") and fmt.get("url"):
+                return fmt
+            return None
+    return None
+
+
+def output_path(item, info_path):
+    # Ask yt-dlp for the name it would use, so files look the same whichever downloader ran.
+    cmd = yt_dlp_base_cmd() + [
+        "--load-info-json", info_path, "-f", item["format_id"], "--print", "filename",
+    ]
+    if item.get("directory"):
+        cmd.extend(["-P", item["directory"]])
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        raise FetchError(result.stderr.strip() or "Could not determine the output file name")
+    return lines[-1]
+
+
+def run_segmented(item, info_path, fmt, on_progress=None):
+    import segmented  # only accelerated mode needs it (and urllib.request)
+
+    task = segmented.SegmentedTask()
+    with _process_lock:
+        item["process"] = task
+        limiter = item["limiter"] = RateLimiter()
+        limiter.set_rate(parse_rate(item.get("speed_limit")))
+    try:
+        dest_path = output_path(item, info_path)
+        segmented.download(
+            fmt["url"],
+            dest_path,
+            connections=int(item.get("connections") or 1),
+            headers=fmt.get("http_headers"),
+            limiter=limiter,
+            on_progress=on_progress,
+            cancel=task.cancel
+        )
+    except FetchCancelled:
+        task.returncode = 1
+        return 1, None, ["Download cancelled"]
+    except FetchError as e:
+        task.returncode = 1
+        if is_throttle_line(str(e)) and item.get("stats"):
+            item["stats"]["throttled"] += 1
+        return 1, None, [str(e)]
+    finally:
+        with _process_lock:
+            item["process"] = None
+            item["limiter"] = None
+    task.returncode = 0
+    if item.get("archive_path") and item.get("archive_id"):
+        record_archive_id(item["archive_path"], item["archive_id"])
+    return 0, dest_path, []
+
+
+def set_speed_limit(item, limit):
+    # Gives a running item a new --limit-rate value. The in-process downloader picks it up at
+    # once; a yt-dlp process is restarted with it (run_download continues from the .part
+    # file) when the change is large enough. Returns the seconds until a change held back by
+    # RESTART_INTERVAL can be applied, or None.
+    with _process_lock:
+        item["speed_limit"] = limit
+        if limit and item.get("stats"):
+            item["stats"]["limited"] = True
+        limiter = item.get("limiter")
+        if limiter is not None:
+            limiter.set_rate(parse_rate(limit))
+            return None
+        process = item.get("process")
+        if process is None or process.poll() is not None:
+            return None
+        running = parse_rate(item.get("running_limit")) or float("inf")
+        rate = parse_rate(limit) or float("inf")
+        if running * RESTART_DROP <= rate <= running * RESTART_RISE:
+            return None
+        wait = item["process_started"] + RESTART_INTERVAL - time.monotonic()
+        if wait > 0:
+            return wait
+        item["restart"] = True
+        try:
+            process.terminate()
+        except OSError:
+            pass
+    return None
+
+
+def run_download(item, info_path=None, on_progress=None):
+    # Runs one download to completion; on_progress(event) is called from this thread.
+    # item["stats"] collects throughput and throttling for the fragment tuner.
+    stats = item["stats"] = {
+        "started": time.monotonic(), "speed_sum": 0.0, "speed_samples": 0, "throttled": 0,
+        "fragmented": False, "limited": bool(item.get("speed_limit")),
+    }
+
+    def track(event):
+        if event.fragment_count:
+            stats["fragmented"] = True
+        if event.speed:
+            stats["speed_sum"] += event.speed
+            stats["speed_samples"] += 1
+        if on_progress is not None:
+            on_progress(event)
+
+    if int(item.get("connections") or 1) > 1 and not item.get("tuned") and not aria2c_available():
+        fmt = segmented_format(item, info_path)
+        if fmt is not None:
+            return run_segmented(item, info_path, fmt, track)
+
+    # Without a fetched document, yt-dlp saves the one it extracts here, for the runs
+    # set_speed_limit() restarts.
+    saved_dir = None if info_path else tempfile.mkdtemp(prefix="glassdrop-info-")
+    try:
+        while True:
+            info_out = os.path.join(saved_dir, "info") if saved_dir and not info_path else None
+            returncode, dest_path, error_tail = _run_process(item, info_path, track, info_out)
+            # Stopped by set_speed_limit(): go again with the new limit, unless the user stopped it too.
+            restart = item.pop("restart", False)
+            if returncode == 0 or not restart or item.get("paused"):
+                return returncode, dest_path, error_tail
+            if info_out:
+                info_path = _saved_info(saved_dir)
+    finally:
+        if saved_dir:
+            shutil.rmtree(saved_dir, ignore_errors=True)
+
+
+def _saved_info(directory):
+    # yt-dlp appends ".info.json" to the template; None (re-extract) if it never got that far.
+    for name in os.listdir(directory):
+        if name.endswith(".json"):
+            return os.path.join(directory, name)
+    return None
+
+
+def _run_process(item, info_path, track, info_out=None):
+    stats = item["stats"]
+    with _process_lock:
+        # Built under the lock set_speed_limit() takes: a new limit either makes it into this
+        # command or finds the process to restart.
+        item["running_limit"] = item.get("speed_limit")
+        item["process_started"] = time.monotonic()
+        process = item["process"] = subprocess.Popen(
+            build_download_cmd(item, info_path, info_out),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True
+        )
+    dest_path = None
+
+    error_tail = []
+    for line in process.stdout:
+        event = parse_progress(line)
+        if event is not None:
+            track(event)
+            continue
+        path = parse_filepath(line)
+        if path:
+            dest_path = path
+            continue
+        if is_throttle_line(line):
+            stats["throttled"] += 1
+        if line.strip():
+            error_tail.append(line.rstrip())
+            if len(error_tail) > 20:
+                error_tail.pop(0)
+
+    process.wait()
+    with _process_lock:
+        item["process"] = None
+
+    return process.returncode, dest_path, error_tail
@@ -0,0 +1,339 @@
+import collections
+import json
+import os
+import subprocess
+import threading
+import time
+
+import metrics
+
+
+class FetchError(Exception):
+    pass
+
+
+class FetchCancelled(FetchError):
+    pass
+
+
+def _check_cancelled(cancel):
+    if cancel is not None and cancel.is_set():
+        raise FetchCancelled("Fetch cancelled")
+
+
+def fetch_bytes(url, cancel=None, timeout=15):
+    # Plain HTTP GET that gives up between chunks once `cancel` (a threading.Event) is set.
+    # Deferred: urllib.request pulls in http.client and email, a large share of startup imports.
+    import urllib.request
+
+    chunks = []
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            while True:
+                _check_cancelled(cancel)
+                chunk = resp.read(64 * 1024)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except FetchCancelled:
+        metrics.incr("http.cancelled")
+        raise
+    except (OSError, ValueError) as e:
+        raise FetchError(str(e))
+    return b"".join(chunks)
+
+
+def yt_dlp_base_cmd():
+    # In Flatpak, run yt-dlp from host system to avoid bundling/network issues.
+    if os.environ.get("FLATPAK_ID"):
+        return ["flatpak-spawn", "--host", "yt-dlp"]
+    return ["yt-dlp"]
+
+
+def inprocess_available():
+    # The Flatpak sandbox has no yt_dlp module of its own; the host binary is the engine there.
+    if os.environ.get("FLATPAK_ID"):
+        return False
+    try:
+        import yt_dlp  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _QuietLogger:
+    # Errors still surface as DownloadError; this only stops yt-dlp from printing them too.
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        pass
+
+    def warning(self, msg):
+        pass
+
+    def error(self, msg):
+        pass
+
+
+_ydl_class = None
+YDL_PARAMS = {
+    "quiet": True,
+    "no_warnings": True,
+    "noprogress": True,
+    "skip_download": True,
+}
+ENTRY_KEYS = ("id", "title", "duration", "ie_key")
+
+
+def _cancellable_ydl(params, cancel=None):
+    global _ydl_class
+    if _ydl_class is None:
+        import yt_dlp
+
+        class CancellableYoutubeDL(yt_dlp.YoutubeDL):
+            cancel = None
+
+            # Every extractor request goes through urlopen, so a superseded
+            # fetch stops at its next HTTP round trip.
+            def urlopen(self, req):
+                _check_cancelled(self.cancel)
+                return super().urlopen(req)
+
+        _ydl_class = CancellableYoutubeDL
+    ydl = _ydl_class(dict(YDL_PARAMS, logger=_QuietLogger(), **params))
+    ydl.cancel = cancel
+    return ydl
+
+
+def _flat_entry(entry):
+    url = entry.get("url") or entry.get("webpage_url")
+    if not url or not url.startswith("http"):
+        return None
+    trimmed = {key: entry[key] for key in ENTRY_KEYS if entry.get(key) is not None}
+    trimmed["url"] = url
+    thumbnails = entry.get("thumbnails") or []
+    thumbnail = entry.get("thumbnail") or (thumbnails[-1].get("url") if thumbnails else None)
+    if thumbnail:
+        trimmed["thumbnail"] = thumbnail
+    return trimmed
+
+
+class InfoEngine:
+
+    def __init__(self, mode="auto"):
+        self.mode = mode
+        self._ydl = None
+        self._ydl_lock = threading.Lock()
+        self._local = threading.local()
+        self._inprocess = None
+
+    def uses_inprocess(self):
+        if self._inprocess is None:
+            if self.mode == "subprocess":
+                self._inprocess = False
+            else:
+                self._inprocess = inprocess_available()
+        return self._inprocess
+
+    def warm_up(self):
+        if self.uses_inprocess():
+            with self._ydl_lock:
+                self._get_ydl()
+
+    def _get_ydl(self):
+        # One YoutubeDL instance keeps the extractor registry and instances loaded between fetches.
+        if self._ydl is None:
+            self._ydl = _cancellable_ydl({})
+        return self._ydl
+
+    def _thread_ydl(self):
+        # Pool workers each keep their own instance, so parallel fetches skip the shared lock.
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = self._local.ydl = _cancellable_ydl({})
+        return ydl
+
+    def extract_info(self, url, cancel=None, shared=True):
+        started = time.perf_counter()
+        try:
+            if self.uses_inprocess():
+                try:
+                    info = self._extract_inprocess(url, cancel, shared)
+                    metrics.record_time("fetch.inprocess", time.perf_counter() - started)
+                    return info
+                except FetchError:
+                    raise
+                except Exception:
+                    # Anything other than a yt-dlp download error is an engine problem;
+                    # the binary is still a valid way to answer the request.
+                    metrics.incr("fetch.inprocess_fallback")
+            info = self._extract_subprocess(url, cancel)
+            metrics.record_time("fetch.subprocess", time.perf_counter() - started)
+            return info
+        except FetchCancelled:
+            metrics.incr("fetch.cancelled")
+            raise
+
+    def _extract_inprocess(self, url, cancel, shared=True):
+        if not shared:
+            return self._extract_with(self._thread_ydl(), url, cancel)
+        with self._ydl_lock:
+            return self._extract_with(self._get_ydl(), url, cancel)
+
+    def _extract_with(self, ydl, url, cancel):
+        from yt_dlp.utils import DownloadError
+        _check_cancelled(cancel)
+        ydl.cancel = cancel
+        try:
+            info = ydl.extract_info(url, download=False)
+        except DownloadError as e:
+            _check_cancelled(cancel)
+            raise FetchError(str(e).strip() or "Unknown error")
+        finally:
+            ydl.cancel = None
+        return ydl.sanitize_info(info)
+
+    def _extract_subprocess(self, url, cancel):
+        _check_cancelled(cancel)
+        cmd = yt_dlp_base_cmd() + ["-J", url]
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+        except OSError as e:
+            raise FetchError(str(e))
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=0.1)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel is not None and cancel.is_set():
+                    process.terminate()
+                    try:
+                        process.communicate(timeout=2)
+                    except subprocess.TimeoutExpired:
+                        process.kill()
+                        process.communicate()
+                    raise FetchCancelled("Fetch cancelled")
+        if process.returncode != 0:
+            raise FetchError(stderr.strip() or stdout.strip() or "Unknown error")
+        try:
+            return json.loads(stdout)
+        except ValueError as e:
+            raise FetchError(f"Invalid yt-dlp output: {e}")
+
+    def iter_playlist(self, url, cancel=None):
+        # Yields compact entries one by one as the extractor pages through the
+        # playlist, so nothing holds the whole -J document.
+        seen = set()
+        if self.uses_inprocess():
+            try:
+                for entry in self._iter_playlist_inprocess(url, cancel):
+                    seen.add(entry.get("id") or entry["url"])
+                    yield entry
+                return
+            except FetchCancelled:
+                metrics.incr("fetch.cancelled")
+                raise
+            except FetchError:
+                raise
+            except Exception:
+                metrics.incr("fetch.inprocess_fallback")
+        try:
+            # The subprocess lists the playlist from the start; entries the in-process
+            # run already yielded before it broke are skipped.
+            for entry in self._iter_playlist_subprocess(url, cancel):
+                if (entry.get("id") or entry["url"]) not in seen:
+                    yield entry
+        except FetchCancelled:
+            metrics.incr("fetch.cancelled")
+            raise
+
+    def _iter_playlist_inprocess(self, url, cancel):
+        from yt_dlp.utils import DownloadError
+        # A separate instance: a channel can page for minutes and must not hold the fetch lock.
+        ydl = _cancellable_ydl({"extract_flat": "in_playlist"}, cancel)
+        try:
+            result = ydl.extract_info(url, download=False, process=False)
+            for _ in range(5):
+                if not result or result.get("_type") not in ("url", "url_transparent"):
+                    break
+                result = ydl.extract_info(
+                    result["url"], download=False, process=False, ie_key=result.get("ie_key")
+                )
+            if not result or result.get("_type") not in ("playlist", "multi_video"):
+                entry = _flat_entry(dict(result or {}, url=url))
+                if entry:
+                    yield entry
+                return
+            for entry in result.get("entries") or []:
+                _check_cancelled(cancel)
+                if not entry:
+                    continue
+                if entry.get("_type") == "playlist":
+                    # Channels list their tabs as nested playlists; flatten one level.
+                    for sub_entry in entry.get("entries") or []:
+                        _check_cancelled(cancel)
+                        trimmed = _flat_entry(sub_entry or {})
+                        if trimmed:
+                            yield trimmed
+                    continue
+                trimmed = _flat_entry(entry)
+                if trimmed:
+                    yield trimmed
+        except DownloadError as e:
+            _check_cancelled(cancel)
+            raise FetchError(str(e).strip() or "Unknown error")
+
+    def _iter_playlist_subprocess(self, url, cancel):
+        _check_cancelled(cancel)
+        cmd = yt_dlp_base_cmd() + ["--flat-playlist", "-j", "--no-warnings", url]
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+        except OSError as e:
+            raise FetchError(str(e))
+        # Killing the child is what unblocks the readline below on cancel.
+        watcher = threading.Thread(target=self._watch_cancel, args=(process, cancel), daemon=True)
+        watcher.start()
+        # stderr is drained on its own thread: a long listing can print more errors than the
+        # pipe holds, and yt-dlp would block on it while this side waits on stdout. Only the
+        # tail is kept for the error message.
+        stderr_tail = collections.deque(maxlen=20)
+        reader = threading.Thread(target=stderr_tail.extend, args=(process.stderr,), daemon=True)
+        reader.start()
+        try:
+            for line in process.stdout:
+                _check_cancelled(cancel)
+                try:
+                    entry = _flat_entry(json.loads(line))
+                except ValueError:
+                    continue
+                if entry:
+                    yield entry
+            process.wait()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        reader.join()
+        _check_cancelled(cancel)
+        if process.returncode != 0:
+            raise FetchError("".join(stderr_tail).strip() or "Unknown error")
+
+    def _watch_cancel(self, process, cancel):
+        if cancel is None:
+            return
+        while process.poll() is None:
+            if cancel.wait(0.2):
+                if process.poll() is None:
+                    process.terminate()
+                return
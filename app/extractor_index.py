@@ -0,0 +1,446 @@
+import importlib.util
+import json
+import os
+import re
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+import config
+import metrics
+from playlist import looks_like_playlist
+
+
+INDEX_FORMAT = 2
+# Stands for any run of characters in an expanded host pattern.
+WILD = "\0"
+HOST_NAME = re.compile(r"^[\w-]+(?:\.[\w-]+)*\.?$")
+FLAG_GROUP = re.compile(r"^\(\?([aiLmsux]+)([):])")
+# Characters that end the host part of a URL.
+HOST_END = re.compile(r"[/:?#]")
+VERSION_LINE = re.compile(r"""^__version__\s*=\s*['"]([^'"]+)['"]""", re.M)
+
+
+def installed_version():
+    # Read yt_dlp/version.py directly: importing the package would load the whole extractor registry.
+    try:
+        spec = importlib.util.find_spec("yt_dlp")
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin:
+        return None
+    try:
+        with open(os.path.join(os.path.dirname(spec.origin), "version.py"), "r", encoding="utf-8") as f:
+            match = VERSION_LINE.search(f.read())
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+
+def url_problem(url):
+    # Checks that need no extractor at all; None when the link is worth handing to yt-dlp.
+    if any(ch.isspace() for ch in url):
+        return "Not a valid link"
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname
+    except ValueError:
+        return "Not a valid link"
+    if parts.scheme not in ("http", "https") or not host:
+        return "Not a valid link"
+    if ":" not in host and not HOST_NAME.match(host):
+        return "Not a valid link"
+    return None
+
+
+def _strip_verbose(pattern):
+    # (?x) patterns: drop whitespace and comments outside character classes.
+    out = []
+    in_class = False
+    index = 0
+    while index < len(pattern):
+        ch = pattern[index]
+        if ch == "\\":
+            out.append(pattern[index:index + 2])
+            index += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch.isspace():
+            index += 1
+            continue
+        elif ch == "#":
+            end = pattern.find("\n", index)
+            index = len(pattern) if end < 0 else end
+            continue
+        out.append(ch)
+        index += 1
+    return "".join(out)
+
+
+def _skip_group(text, index):
+    # Index just past the ")" closing the group that index is inside of.
+    depth = 0
+    in_class = False
+    while index < len(text):
+        ch = text[index]
+        if ch == "\\":
+            index += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            if depth == 0:
+                return index + 1
+            depth -= 1
+        index += 1
+    return index
+
+
+def _plain(pattern):
+    # The pattern without leading inline flags, and without (?x) layout.
+    flags = FLAG_GROUP.match(pattern)
+    if flags:
+        # (?x) applies to the rest, (?x:...) is an ordinary group with flags.
+        pattern = pattern[flags.end():] if flags.group(2) == ")" else "(?:" + pattern[flags.end():]
+        if "x" in flags.group(1):
+            pattern = _strip_verbose(pattern)
+    return pattern
+
+
+def _host_section(pattern):
+    # The part of a URL pattern between "//" and the first "/" outside any group.
+    pattern = _plain(pattern)
+    start = pattern.find("//")
+    if start < 0:
+        return ""
+    text = pattern[start + 2:]
+    index = 0
+    # Leave a scheme group such as (?:https?://)? or (?:https?://|//).
+    while index < len(text) and text[index] in ")|":
+        index = index + 1 if text[index] == ")" else _skip_group(text, index)
+        if text[index:index + 1] == "?":
+            index += 1
+    text = text[index:]
+    depth = 0
+    in_class = False
+    index = 0
+    while index < len(text):
+        ch = text[index]
+        if ch == "\\":
+            index += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth < 0:
+                break
+        elif ch in "/|" and depth == 0:
+            break
+        index += 1
+    return text[:index]
+
+
+class _Unexpandable(Exception):
+    pass
+
+
+class _Expander:
+    # Enumerates the strings a small regex fragment can match. Anything open-ended
+    # (\w, most classes, repeats) becomes WILD; too many strings or unfamiliar syntax
+    # raise _Unexpandable.
+
+    def __init__(self, text, limit=4096):
+        self.text = text
+        self.limit = limit
+        self.pos = 0
+
+    def run(self):
+        strings = self.alternation()
+        if self.pos != len(self.text):
+            raise _Unexpandable()
+        return strings
+
+    def alternation(self):
+        strings = self.sequence()
+        while self.text[self.pos:self.pos + 1] == "|":
+            self.pos += 1
+            strings |= self.sequence()
+        if len(strings) > self.limit:
+            raise _Unexpandable()
+        return strings
+
+    def sequence(self):
+        strings = {""}
+        while self.pos < len(self.text) and self.text[self.pos] not in "|)":
+            atom = self.atom()
+            quantifier = self.text[self.pos:self.pos + 1]
+            if quantifier == "?":
+                self.pos += 1
+                atom = atom | {""}
+            elif quantifier in ("*", "+", "{"):
+                self.pos = self.text.index("}", self.pos) + 1 if quantifier == "{" else self.pos + 1
+                if self.text[self.pos:self.pos + 1] == "?":
+                    self.pos += 1
+                # (?:\w+\.)+ still ends on a label boundary.
+                atom = {WILD + "."} if {string[-1:] for string in atom} == {"."} else {WILD}
+            # Once a string has left the host there is no need to grow it further.
+            strings = {
+                head if HOST_END.search(head) else head + tail
+                for head in strings for tail in atom
+            }
+            if len(strings) > self.limit:
+                raise _Unexpandable()
+        return strings
+
+    def atom(self):
+        text = self.text
+        ch = text[self.pos]
+        if ch == "(":
+            if text.startswith("(?:", self.pos):
+                self.pos += 3
+            elif text.startswith("(?P<", self.pos):
+                self.pos = text.index(">", self.pos) + 1
+            elif text.startswith(("(?=", "(?!", "(?<=", "(?<!"), self.pos):
+                # Lookarounds match no characters.
+                self.pos = _skip_group(text, self.pos + 1)
+                return {""}
+            elif text.startswith("(?", self.pos):
+                raise _Unexpandable()
+            else:
+                self.pos += 1
+            strings = self.alternation()
+            if text[self.pos:self.pos + 1] != ")":
+                raise _Unexpandable()
+            self.pos += 1
+            return strings
+        if ch == "[":
+            end = self.pos + 1
+            while end < len(text) and (text[end] != "]" or end == self.pos + 1):
+                end += 2 if text[end] == "\\" else 1
+            body = text[self.pos + 1:end]
+            self.pos = end + 1
+            # [yY][oO]... spells a word case-insensitively.
+            if len(body) == 2 and body[0].isalpha() and body[0].lower() == body[1].lower():
+                return {body[0].lower()}
+            return {WILD}
+        if ch == "\\":
+            escaped = text[self.pos + 1:self.pos + 2]
+            self.pos += 2
+            return {WILD} if escaped.isalnum() else {escaped}
+        self.pos += 1
+        if ch == ".":
+            return {WILD}
+        if ch in "^$":
+            return {""}
+        return {ch.lower()}
+
+
+def pattern_domains(pattern):
+    # Host names (or the known tail of one, after a wildcard label) a URL pattern can
+    # match; None when some host it accepts has no usable name, such as example\.\w+.
+    section = _host_section(pattern)
+    if not section:
+        return None
+    try:
+        hosts = _Expander(section).run()
+    except (_Unexpandable, ValueError, IndexError):
+        return None
+    domains = set()
+    for host in hosts:
+        # A group can run on into the path, port or query; only the host part counts.
+        host = HOST_END.split(host, 1)[0]
+        tail = host.rsplit(WILD, 1)[-1]
+        if tail != host:
+            # After a wildcard, only whole labels are known: v8[-.]psapi\.nrk\.no gives nrk.no.
+            tail = tail[1:] if tail.startswith(".") else tail.partition(".")[2]
+        if "." not in tail or not HOST_NAME.match(tail):
+            return None
+        domains.add(tail)
+    return domains
+
+
+def can_match_http(pattern):
+    # Patterns for pseudo-schemes (ytsearch:, anvato:...) never see a pasted http link.
+    pattern = _plain(pattern)
+    if "//" in pattern:
+        return True
+    pattern = pattern.lstrip("^")
+    while pattern.startswith("("):
+        if pattern.startswith("(?P<"):
+            pattern = pattern[pattern.index(">") + 1:]
+        elif pattern.startswith("(?:"):
+            pattern = pattern[3:]
+        else:
+            pattern = pattern[1:]
+    return not (pattern[:1].isalnum() or pattern[:1] == ":")
+
+
+def _host_keys(host):
+    labels = host.rstrip(".").split(".")
+    return [".".join(labels[index:]) for index in range(len(labels) - 1)] or [host]
+
+
+def build(version):
+    import inspect
+    from yt_dlp.extractor import gen_extractor_classes
+    from yt_dlp.extractor.common import InfoExtractor
+    from yt_dlp.utils import variadic
+
+    started = time.perf_counter()
+    extractors = []
+    domains = {}
+    wildcard = []
+    for ie in gen_extractor_classes():
+        if ie.ie_key() == "Generic" or not ie._VALID_URL:
+            continue
+        real = getattr(ie, "real_class", ie)
+        patterns = list(variadic(ie._VALID_URL))
+        web_patterns = [pattern for pattern in patterns if can_match_http(pattern)]
+        names = set() if web_patterns else None
+        for pattern in web_patterns:
+            found = pattern_domains(pattern)
+            if not found:
+                names = None
+                break
+            names |= found
+        if names:
+            # The extractor's own test URLs must land on one of its keys, or it is checked for every host.
+            # Lazy extractors carry no tests; getattr_static avoids yt-dlp's lazy fallback warning.
+            tests = [inspect.getattr_static(real, "_TEST", None)]
+            tests += list(inspect.getattr_static(real, "_TESTS", None) or [])
+            for test in tests:
+                url = (test or {}).get("url") or ""
+                try:
+                    host = (urlsplit(url).hostname or "").lower()
+                    suitable = url.startswith("http") and ie.suitable(url)
+                except Exception:
+                    continue
+                if suitable and not names.intersection(_host_keys(host)):
+                    names = None
+                    break
+        position = len(extractors)
+        extractors.append({
+            "key": ie.ie_key(),
+            "name": ie.IE_NAME,
+            "description": ie.IE_DESC if isinstance(ie.IE_DESC, str) else "",
+            # yt-dlp leaves extractors with IE_DESC = False out of its supported sites list.
+            "listed": ie.IE_DESC is not False,
+            "patterns": patterns,
+            "returns": getattr(ie, "_RETURN_TYPE", None) or "any",
+            "working": bool(ie._WORKING),
+            # Its own suitable() can turn down a URL the pattern accepts, leaving it to a later extractor.
+            "custom_suitable": real.suitable.__func__ is not InfoExtractor.suitable.__func__,
+            "domains": sorted(names or []),
+        })
+        if names:
+            for name in names:
+                domains.setdefault(name, []).append(position)
+        elif web_patterns:
+            wildcard.append(position)
+    metrics.record_time("extractor_index.build", time.perf_counter() - started)
+    return {
+        "format": INDEX_FORMAT,
+        "version": version,
+        "extractors": extractors,
+        "domains": domains,
+        "wildcard": wildcard,
+    }
+
+
+def index_path():
+    return os.path.join(config.cache_dir(), "extractors.json")
+
+
+def load_index(path=None):
+    # The index is rebuilt only when the installed yt-dlp version changes.
+    # None when the yt_dlp module is not available (e.g. inside the Flatpak sandbox).
+    version = installed_version()
+    if version is None:
+        return None
+    path = path or index_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") == INDEX_FORMAT and data.get("version") == version:
+            return ExtractorIndex(data)
+    except (OSError, ValueError):
+        pass
+    try:
+        data = build(version)
+    except Exception:
+        return None
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A temp name per writer, so another process building the same index cannot interleave.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return ExtractorIndex(data)
+
+
+class ExtractorIndex:
+
+    def __init__(self, data):
+        self.version = data["version"]
+        self.extractors = data["extractors"]
+        self.by_domain = data["domains"]
+        self.wildcard = data["wildcard"]
+        self._compiled = {}
+
+    def _patterns(self, position):
+        compiled = self._compiled.get(position)
+        if compiled is None:
+            compiled = self._compiled[position] = [
+                re.compile(pattern) for pattern in self.extractors[position]["patterns"]
+            ]
+        return compiled
+
+    def candidates(self, url):
+        # Extractors whose patterns accept the URL, in yt-dlp's own order.
+        try:
+            host = (urlsplit(url).hostname or "").lower()
+        except ValueError:
+            return
+        positions = set(self.wildcard)
+        for key in _host_keys(host):
+            positions.update(self.by_domain.get(key, ()))
+        for position in sorted(positions):
+            if any(pattern.match(url) for pattern in self._patterns(position)):
+                yield self.extractors[position]
+
+    def match(self, url):
+        # The extractor yt-dlp would most likely pick, or None when only its generic
+        # extractor could try the URL.
+        return next(self.candidates(url), None)
+
+    def is_playlist(self, url):
+        # Extractors that always return one kind decide. One with its own suitable() may
+        # pass the URL on, so the ones after it have to agree; otherwise the URL shape decides.
+        kinds = set()
+        for extractor in self.candidates(url):
+            kinds.add(extractor["returns"])
+            if not extractor["custom_suitable"]:
+                break
+        if len(kinds) == 1 and kinds <= {"video", "playlist"}:
+            return kinds == {"playlist"}
+        return looks_like_playlist(url)
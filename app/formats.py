@@ -0,0 +1,103 @@
+class Format:
+    # The fields of one yt-dlp format the app uses. Fragment lists, stream URLs and
+    # HTTP headers are dropped, so keeping the ranked formats costs little.
+    __slots__ = ("format_id", "ext", "height", "vcodec", "acodec", "tbr", "abr", "size")
+
+    def __init__(self, f, duration=None):
+        self.format_id = f["format_id"]
+        self.ext = f.get("ext")
+        self.height = f.get("height")
+        self.vcodec = f.get("vcodec")
+        self.acodec = f.get("acodec")
+        self.tbr = f.get("tbr") or 0
+        self.abr = f.get("abr") or 0
+        self.size = estimated_size(f, duration)
+
+    @property
+    def has_audio(self):
+        return self.acodec not in (None, "none")
+
+
+def estimated_size(f, duration=None):
+    # Bytes for one format: the reported size, yt-dlp's approximation, or bitrate x duration.
+    size = f.get("filesize") or f.get("filesize_approx")
+    if size:
+        return int(size)
+    if f.get("tbr") and duration:
+        return int(f["tbr"] * 1000 / 8 * duration)
+    return None
+
+
+class FormatTable:
+    # Everything the format dropdown and the presets need, worked out once per fetch:
+    #   video_items  (label, format_id) per (height, ext), highest first
+    #   audio_items  (label, format_id) of the best audio-only format
+    #   choices      one download per height for the Auto preset, highest first
+    __slots__ = ("by_id", "video_items", "audio_items", "choices")
+
+    def __init__(self, formats, duration=None):
+        # Ranked on the raw dicts in one pass; only the formats that end up in the table
+        # become records.
+        by_key = {}
+        by_height = {}
+        best_audio = None
+        for f in formats:
+            get = f.get
+            if not get("format_id"):
+                continue
+            if get("vcodec") == "none":
+                if get("acodec") in (None, "none"):
+                    continue
+                rank = (get("abr") or 0, get("tbr") or 0)
+                if best_audio is None or rank > best_audio[0]:
+                    best_audio = (rank, f)
+                continue
+            height = get("height")
+            if not height:
+                continue
+            # Highest bitrate per (height, ext) for the dropdown, per height for Auto.
+            tbr = get("tbr") or 0
+            key = (height, get("ext") or "unknown")
+            best = by_key.get(key)
+            if best is None or tbr > best[0]:
+                by_key[key] = (tbr, f)
+            best = by_height.get(height)
+            if best is None or tbr > best[0]:
+                by_height[height] = (tbr, f)
+
+        self.by_id = {}
+        record = self._record
+
+        keys = sorted(by_key, key=lambda key: (-key[0], key[1]))
+        self.video_items = [
+            (f"{height}p - {ext}", record(by_key[(height, ext)][1], duration).format_id)
+            for height, ext in keys
+        ]
+
+        audio = record(best_audio[1], duration) if best_audio else None
+        self.audio_items = []
+        if audio is not None:
+            self.audio_items.append((f"Audio Only - {audio.ext or 'audio'}", audio.format_id))
+
+        self.choices = []
+        for height in sorted(by_height, reverse=True):
+            video = record(by_height[height][1], duration)
+            selector = video.format_id
+            size = video.size
+            if not video.has_audio and audio is not None:
+                selector = f"{video.format_id}+{audio.format_id}"
+                size = size + audio.size if size and audio.size else None
+            self.choices.append({"label": f"{height}p", "height": height, "format": selector, "size": size})
+
+    def _record(self, f, duration):
+        record = self.by_id.get(f["format_id"])
+        if record is None:
+            record = self.by_id[f["format_id"]] = Format(f, duration)
+        return record
+
+    def get(self, format_id):
+        return self.by_id.get(format_id)
+
+    def items(self):
+        # Dropdown entries: the video qualities, then the audio-only entries.
+        return self.video_items + self.audio_items
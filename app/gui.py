@@ -0,0 +1,1885 @@
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+
+from gi.repository import Gtk, Adw, GLib, Gdk, GObject, Gio, Pango
+import threading
+import os
+import time
+
+import config
+import metrics
+from autoquality import ThroughputLog, choose_quality, describe_estimate
+from archive import DownloadArchive, archive_id, archive_path, info_archive_id, record_archive_id
+from bandwidth import BandwidthBudget, parse_rate
+from cache import InfoCache, InfoJsonStore
+from dispatcher import UiDispatcher
+from downloader import backoff_delay, classify_error, info_expiry, item_key, new_queue_item, run_download, set_speed_limit
+from engine import FetchCancelled, FetchError, InfoEngine
+from extractor_index import load_index, url_problem
+from formats import FormatTable
+from history_model import HistoryModel
+from history_store import HistoryStore
+from multifetch import fetch_all, split_urls
+from playlist import looks_like_playlist
+from postprocess import PostProcessPool, audio_job, ffmpeg_available
+from presets import BULK_PRESETS, PRESETS
+from progress import format_bytes, format_eta
+from queue_model import QueueRow
+from queue_store import QueueStore
+from scheduler import DownloadScheduler, host_of
+from sites_model import SiteEntry
+from supported_sites import load_sites, matches
+from thumbnails import ThumbnailCache, ThumbnailLoader
+from tuning import FragmentTuner, tuning_key
+
+
+class GlassDrop(Adw.Application):
+
+    def __init__(self, started=None):
+        flags = Gio.ApplicationFlags.FLAGS_NONE
+        if os.environ.get("GLASSDROP_STARTUP_BENCH"):
+            # A benchmark run must start its own instance, not activate one already open.
+            flags = Gio.ApplicationFlags.NON_UNIQUE
+        super().__init__(application_id="com.milas.GlassDrop", flags=flags)
+        self.started = started or time.perf_counter()
+        self.win = None
+        self.connect("activate", self.on_activate)
+        self.connect("shutdown", self.on_shutdown)
+        self.fetch_token = 0
+        self.fetch_cancel = None
+        self.current_url = ""
+        self.current_title = ""
+        self.current_thumbnail = None
+        self.current_duration = None
+        self.current_archive_id = None
+        self.format_table = FormatTable([])
+        self.formats = []
+        self.dropdown_format_ids = []
+        self.preset_options = []
+        self.playlist_mode = False
+        self.pending_title = "Playlist"
+        self.pending_entries = []
+        self.pending_buffer = []
+        self.pending_lock = threading.Lock()
+        self.queue = []
+        self.queue_keys = set()
+        self.speed_limit = None
+        self.settings = config.load_settings()
+        self.connections = config.connections_setting(self.settings)
+        self.engine = InfoEngine(self.settings.get("fetch_engine", "auto"))
+        # Set from a background thread after the first frame; URL shape heuristics until then.
+        self.extractor_index = None
+        self.extractor_index_lock = threading.Lock()
+        self.extractor_index_loaded = False
+        self.info_cache = InfoCache(
+            os.path.join(config.cache_dir(), "info"),
+            ttl=self.settings.get("info_cache_ttl", 3600),
+            max_bytes=int(self.settings.get("info_cache_max_mb", 50) * 1024 * 1024),
+        )
+        self.info_json_store = InfoJsonStore(
+            os.path.join(config.cache_dir(), "infojson"),
+            max_age=self.settings.get("info_json_max_age", 1800),
+        )
+        self.scheduler = DownloadScheduler(
+            max_active=self.settings.get("max_concurrent_downloads", 3),
+            max_per_host=self.settings.get("max_downloads_per_host", 2),
+        )
+        self.bandwidth = BandwidthBudget(None, self.settings.get("bandwidth_schedule"))
+        self.thumbnails = ThumbnailLoader(ThumbnailCache(
+            os.path.join(config.cache_dir(), "thumbnails"),
+            max_bytes=int(self.settings.get("thumbnail_cache_max_mb", 100) * 1024 * 1024),
+        ))
+        self.throughput = ThroughputLog(os.path.join(config.data_dir(), "throughput.json"))
+        self.tuner = FragmentTuner(os.path.join(config.data_dir(), "fragment_tuning.json"))
+        self.ui = UiDispatcher(lambda: self.fetch_token, hz=self.settings.get("ui_refresh_hz", 20))
+        # The queue and history databases, the archive and the ffmpeg probe are opened on
+        # first use (see lazy()), so none of that runs before the first frame.
+        self.lazy_values = {}
+        self.lazy_lock = threading.Lock()
+        self.archive_path = archive_path(self.settings.get("download_archive", True))
+        self.postprocessor = PostProcessPool(self.settings.get("postprocess_workers"))
+        self.postprocessing = []
+        self.paused_items = []
+        self.max_retries = self.settings.get("download_retries", 4)
+        self.wakeup_at = None
+        self.bandwidth_timer = None
+        self.queue_restored = False
+
+    def lazy(self, name, create):
+        with self.lazy_lock:
+            if name not in self.lazy_values:
+                self.lazy_values[name] = create()
+            return self.lazy_values[name]
+
+    @property
+    def queue_store(self):
+        return self.lazy("queue_store", lambda: QueueStore(os.path.join(config.data_dir(), "queue.sqlite3")))
+
+    @property
+    def history_store(self):
+        return self.lazy("history_store", lambda: HistoryStore(os.path.join(config.data_dir(), "history.sqlite3")))
+
+    @property
+    def archive(self):
+        if not self.archive_path:
+            return None
+        return self.lazy("archive", lambda: DownloadArchive(self.archive_path))
+
+    @property
+    def offload_postprocessing(self):
+        # Audio conversion leaves the download slot for a CPU pool when ffmpeg can be run directly.
+        return self.lazy("offload_postprocessing", ffmpeg_available)
+
+    def on_activate(self, app):
+        # Launching the app again while it runs activates this instance: bring the
+        # window forward instead of rebuilding it over the live queue and history.
+        if self.win is not None:
+            self.win.present()
+            return
+
+        self.win = Adw.ApplicationWindow(application=app)
+        self.win.set_default_size(820, 750)
+        self.win.set_title("GlassDrop")
+
+        icon_dir = os.path.join(os.path.dirname(__file__), "assets")
+        icon_theme = Gtk.IconTheme.get_for_display(Gdk.Display.get_default())
+        icon_theme.add_search_path(icon_dir)
+        self.win.set_icon_name("com.milas.GlassDrop")
+
+        self.style_manager = Adw.StyleManager.get_default()
+        self.load_css()
+
+        toolbar_view = Adw.ToolbarView()
+        header = Adw.HeaderBar()
+
+        menu_model = self.build_menu_model()
+        self.install_actions()
+
+        menu_button = Gtk.MenuButton()
+        menu_button.add_css_class("logo-menu-button")
+        menu_button.set_icon_name("open-menu-symbolic")
+        menu_button.set_menu_model(menu_model)
+        menu_button.set_tooltip_text("Menu")
+
+        header.set_title_widget(Gtk.Label(label="GlassDrop"))
+        header.pack_end(menu_button)
+        toolbar_view.add_top_bar(header)
+
+        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=24)
+        content.set_margin_top(40)
+        content.set_margin_bottom(40)
+        content.set_margin_start(40)
+        content.set_margin_end(40)
+        content.add_css_class("frost-card")
+        content.add_css_class("content-wrap")
+
+        # URL Entry (AUTO FETCH)
+        self.url_entry = Gtk.Entry()
+        self.url_entry.set_placeholder_text("Paste YouTube URL and press Enter...")
+        self.url_entry.add_css_class("glass-input")
+        self.url_entry.set_hexpand(True)
+        self.url_entry.set_has_frame(False)
+        self.url_entry.connect("activate", self.fetch_info)
+
+        self.paste_button = Gtk.Button(label="Paste")
+        self.paste_button.add_css_class("paste-button")
+        self.paste_button.connect("clicked", self.on_paste_clicked)
+
+        self.url_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        self.url_row.add_css_class("url-row")
+        self.url_row.set_hexpand(True)
+        self.url_row.append(self.url_entry)
+        self.url_row.append(self.paste_button)
+
+        # Thumbnail Container
+        self.thumb_container = Gtk.Box()
+        self.thumb_container.set_halign(Gtk.Align.CENTER)
+        self.thumb_container.add_css_class("thumb-frame")
+
+        self.thumb_frame = Gtk.AspectFrame()
+        self.thumb_frame.set_ratio(16 / 9)
+        self.thumb_frame.set_obey_child(False)
+        self.thumb_frame.set_size_request(520, 292)
+        self.thumb_frame.set_halign(Gtk.Align.CENTER)
+        self.thumb_frame.set_valign(Gtk.Align.CENTER)
+
+        self.thumbnail = Gtk.Picture()
+        self.thumbnail.set_content_fit(Gtk.ContentFit.CONTAIN)
+        self.thumbnail.set_can_shrink(True)
+        self.thumbnail.set_halign(Gtk.Align.CENTER)
+        self.thumbnail.set_valign(Gtk.Align.CENTER)
+        self.thumbnail.add_css_class("thumb-preview")
+
+        self.thumb_frame.set_child(self.thumbnail)
+
+        self.thumb_loading_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        self.thumb_loading_box.set_halign(Gtk.Align.CENTER)
+        self.thumb_loading_box.set_valign(Gtk.Align.CENTER)
+        self.thumb_loading_box.add_css_class("thumb-loading")
+
+        self.thumb_skeleton = Gtk.Box()
+        self.thumb_skeleton.add_css_class("thumb-skeleton")
+        self.thumb_skeleton.set_size_request(520, 292)
+        self.thumb_loading_label = Gtk.Label(label="Loading thumbnail...")
+        self.thumb_loading_box.append(self.thumb_skeleton)
+        self.thumb_loading_box.append(self.thumb_loading_label)
+        self.thumb_loading_box.set_visible(False)
+
+        self.thumb_overlay = Gtk.Overlay()
+        self.thumb_overlay.set_child(self.thumb_frame)
+        self.thumb_overlay.add_overlay(self.thumb_loading_box)
+
+        self.thumb_container.append(self.thumb_overlay)
+
+        # Title
+        self.title_label = Gtk.Label()
+        self.title_label.set_wrap(True)
+        self.title_label.set_justify(Gtk.Justification.CENTER)
+        self.title_label.set_max_width_chars(70)
+
+        # Presets
+        self.presets_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        self.presets_row.add_css_class("preset-row")
+        self.presets_label = Gtk.Label(label="Preset")
+        self.presets_label.set_xalign(0.0)
+        self.presets_dropdown = Gtk.DropDown.new_from_strings(["Selected format"])
+        self.presets_row.append(self.presets_label)
+        self.presets_row.append(self.presets_dropdown)
+        self.presets_row.set_sensitive(False)
+        self.presets_row.set_hexpand(True)
+        self.presets_dropdown.set_hexpand(True)
+
+        # Format Dropdown
+        self.format_dropdown = Gtk.DropDown.new_from_strings(["No formats loaded"])
+        self.formats = []
+
+        # Speed Limit
+        self.speed_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        self.speed_row.add_css_class("speed-row")
+        self.speed_label = Gtk.Label(label="Speed Limit")
+        self.speed_label.set_xalign(0.0)
+        self.speed_dropdown = Gtk.DropDown.new_from_strings(
+            ["No limit", "1M", "2M", "5M"]
+        )
+        self.speed_dropdown.set_tooltip_text("Shared by all active downloads")
+        self.speed_dropdown.connect("notify::selected", self.on_speed_changed)
+        self.connection_options = ["auto", 1, 4, 8, 16]
+        self.connections_dropdown = Gtk.DropDown.new_from_strings(
+            ["Auto connections", "1 connection"]
+            + [f"{count} connections" for count in self.connection_options[2:]]
+        )
+        self.connections_dropdown.set_tooltip_text(
+            "Parallel connections per download (ranged HTTP and DASH/HLS fragments). "
+            "Auto tunes DASH/HLS fragments per site from measured speed and throttling."
+        )
+        if self.connections in self.connection_options:
+            self.connections_dropdown.set_selected(self.connection_options.index(self.connections))
+        self.connections_dropdown.connect("notify::selected", self.on_connections_changed)
+        self.speed_row.append(self.speed_label)
+        self.speed_row.append(self.speed_dropdown)
+        self.speed_row.append(self.connections_dropdown)
+        self.speed_row.set_hexpand(True)
+        self.speed_dropdown.set_hexpand(True)
+
+        # Download Button
+        self.download_button = Gtk.Button(label="Download")
+        self.download_button.add_css_class("glass-button")
+        self.download_button.connect("clicked", self.start_download)
+        self.download_button.set_sensitive(False)
+
+        # Progress
+        self.progress = Gtk.ProgressBar()
+        self.status_label = Gtk.Label(label="Idle")
+
+        # Playlist entries waiting to be queued
+        self.pending_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        self.pending_label = Gtk.Label(label="Playlist")
+        self.pending_label.set_xalign(0.0)
+        self.pending_list = Gtk.ListBox()
+        self.pending_list.add_css_class("queue-list")
+        self.pending_list.set_selection_mode(Gtk.SelectionMode.NONE)
+        self.pending_more_label = Gtk.Label()
+        self.pending_more_label.add_css_class("queue-meta")
+        self.pending_more_label.set_xalign(0.0)
+        self.pending_more_label.set_visible(False)
+        pending_scroller = Gtk.ScrolledWindow()
+        pending_scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        pending_scroller.set_max_content_height(240)
+        pending_scroller.set_propagate_natural_height(True)
+        pending_scroller.set_child(self.pending_list)
+        self.pending_box.append(self.pending_label)
+        self.pending_box.append(pending_scroller)
+        self.pending_box.append(self.pending_more_label)
+        self.pending_box.set_visible(False)
+
+        # Queue + History
+        self.queue_label = Gtk.Label(label="Queue")
+        self.queue_label.set_xalign(0.0)
+        # Queue items are QueueRow records; the list view builds widgets only for visible rows
+        # and rebinds them while scrolling.
+        self.queue_rows = Gio.ListStore(item_type=QueueRow)
+        queue_factory = Gtk.SignalListItemFactory()
+        queue_factory.connect("setup", self.on_queue_setup)
+        queue_factory.connect("bind", self.on_queue_bind)
+        queue_factory.connect("unbind", self.on_queue_unbind)
+        self.queue_list = Gtk.ListView(
+            model=Gtk.NoSelection(model=self.queue_rows),
+            factory=queue_factory
+        )
+        self.queue_list.add_css_class("queue-list")
+        queue_scroller = Gtk.ScrolledWindow()
+        queue_scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        queue_scroller.set_min_content_height(240)
+        queue_scroller.set_child(self.queue_list)
+
+        self.history_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        self.history_label = Gtk.Label(label="History")
+        self.history_label.set_xalign(0.0)
+        self.history_label.set_hexpand(True)
+        self.history_clear_button = Gtk.Button(label="Clear")
+        self.history_clear_button.add_css_class("history-clear")
+        self.history_clear_button.connect("clicked", self.clear_history)
+        self.history_search = Gtk.SearchEntry(placeholder_text="Search history")
+        self.history_search.connect("search-changed", self.on_history_search)
+        self.history_row.append(self.history_label)
+        self.history_row.append(self.history_search)
+        self.history_row.append(self.history_clear_button)
+
+        # Rows are recycled as the list scrolls, so only the visible ones exist as widgets.
+        # The model (a COUNT over the history table) is attached after the first frame.
+        self.history_model = None
+        self.history_selection = Gtk.NoSelection()
+        history_factory = Gtk.SignalListItemFactory()
+        history_factory.connect("setup", self.on_history_setup)
+        history_factory.connect("bind", self.on_history_bind)
+        self.history_list = Gtk.ListView(
+            model=self.history_selection,
+            factory=history_factory
+        )
+        self.history_list.add_css_class("history-list")
+        history_scroller = Gtk.ScrolledWindow()
+        history_scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        history_scroller.set_min_content_height(320)
+        history_scroller.set_child(self.history_list)
+
+        content.append(self.url_row)
+        content.append(self.thumb_container)
+        content.append(self.title_label)
+        content.append(self.presets_row)
+        content.append(self.format_dropdown)
+        content.append(self.speed_row)
+        content.append(self.download_button)
+        content.append(self.progress)
+        content.append(self.status_label)
+        content.append(self.pending_box)
+        content.append(self.queue_label)
+        content.append(queue_scroller)
+        content.append(self.history_row)
+        content.append(history_scroller)
+
+        scroller = Gtk.ScrolledWindow()
+        scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scroller.set_child(content)
+
+        self.toast_overlay = Adw.ToastOverlay()
+        self.toast_overlay.set_child(scroller)
+        toolbar_view.set_content(self.toast_overlay)
+        self.add_drop_target()
+        self.add_key_controller()
+        self.win.set_content(toolbar_view)
+        self.win.present()
+        self.url_entry.grab_focus()
+        self.trace_startup("present")
+        # Nothing below is needed to paint the window, so it waits for the first frame.
+        frame_clock = self.win.get_frame_clock()
+        if frame_clock is None:
+            GLib.idle_add(self.on_first_frame)
+            return
+        handler_ids = []
+
+        def on_after_paint(clock):
+            clock.disconnect(handler_ids[0])
+            self.trace_startup("first_frame")
+            GLib.idle_add(self.on_first_frame)
+
+        handler_ids.append(frame_clock.connect("after-paint", on_after_paint))
+
+    def on_first_frame(self):
+        self.trace_startup("interactive")
+        # One step per idle callback, so input that arrives meanwhile is handled in between.
+        steps = [
+            self.attach_history,
+            self.restore_queue,
+            lambda: threading.Thread(target=self.engine.warm_up, daemon=True).start(),
+            lambda: threading.Thread(target=self.load_extractor_index, daemon=True).start(),
+            self.check_clipboard_on_start,
+            self.show_disclaimer,
+        ]
+
+        def run_next():
+            steps.pop(0)()
+            if steps:
+                return True
+            self.trace_startup("settled")
+            if os.environ.get("GLASSDROP_STARTUP_BENCH"):
+                self.quit()
+            return False
+
+        GLib.idle_add(run_next, priority=GLib.PRIORITY_LOW)
+        return False
+
+    def load_extractor_index(self):
+        # Called from the startup step and the supported sites dialog, both on worker threads:
+        # the first caller loads (or builds) the index, the other waits and shares it.
+        with self.extractor_index_lock:
+            if not self.extractor_index_loaded:
+                self.extractor_index = load_index()
+                self.extractor_index_loaded = True
+        return self.extractor_index
+
+    def is_playlist_url(self, url):
+        if self.extractor_index is not None:
+            return self.extractor_index.is_playlist(url)
+        return looks_like_playlist(url)
+
+    def trace_startup(self, name):
+        # GLASSDROP_DEBUG prints these; benchmarks/bench_startup.py reads them.
+        metrics.record_time(f"startup.{name}", time.perf_counter() - self.started)
+
+    def attach_history(self):
+        if self.history_model is None:
+            self.history_model = HistoryModel(self.history_store)
+            # A search typed before the model existed still applies.
+            if self.history_search.get_text():
+                self.history_model.set_query(self.history_search.get_text())
+            self.history_selection.set_model(self.history_model)
+
+    def restore_queue(self):
+        # Items still queued or interrupted when the app last exited start again;
+        # yt-dlp continues from the .part files left in their download directory.
+        if self.queue_restored:
+            return
+        self.queue_restored = True
+        self.enqueue_items([
+            self.make_queue_item(
+                saved["url"],
+                saved["format_id"],
+                saved["title"] or saved["url"],
+                saved["format_label"] or "",
+                format_selector=saved["format_selector"],
+                post_args=saved["post_args"],
+                thumbnail=saved["thumbnail"],
+                directory=saved["directory"],
+                store_id=saved["store_id"],
+                archive_id=saved["archive_id"],
+                status_text="Paused" if saved["interrupted"] else "Queued"
+            )
+            for saved in self.queue_store.resumable_items()
+        ])
+
+    def stop_active(self):
+        for item in list(self.scheduler.active) + self.postprocessing:
+            item["paused"] = True
+            process = item.get("process")
+            if process and process.poll() is None:
+                try:
+                    process.terminate()
+                except Exception:
+                    pass
+
+    def on_shutdown(self, _app):
+        # Active rows stay in the queue store, so the next start resumes them.
+        self.stop_active()
+        for name in ("queue_store", "history_store"):
+            if name in self.lazy_values:
+                self.lazy_values[name].close()
+
+    def build_menu_model(self):
+        menu = Gio.Menu()
+
+        main_section = Gio.Menu()
+        main_section.append("Donate via UPI", "app.donate")
+        main_section.append("Credits", "app.credits")
+        main_section.append("License", "app.license")
+        main_section.append("Supported Sites", "app.supported_sites")
+        main_section.append("Check for Updates", "app.check_updates")
+        menu.append_section(None, main_section)
+
+        return menu
+
+    def show_disclaimer(self):
+        flag_path = os.path.join(config.config_dir(), "disclaimer.ok")
+        if os.environ.get("GLASSDROP_STARTUP_BENCH") or os.path.exists(flag_path):
+            return
+
+        dialog = Adw.MessageDialog.new(self.win, "Disclaimer", None)
+        disclaimer_label = Gtk.Label(
+            label=(
+                "This app is for downloading content you own or have permission to use.\n\n"
+                "If you decide copyright laws are “optional,” that’s your decision and your consequences.\n\n"
+                "The developer made the app. What you do with it is on you."
+            )
+        )
+        disclaimer_label.set_wrap(True)
+        disclaimer_label.set_xalign(0.0)
+        disclaimer_label.set_justify(Gtk.Justification.LEFT)
+        dialog.add_response("ok", "I Understand")
+        dialog.set_default_response("ok")
+        dialog.set_close_response("ok")
+        dialog.set_response_enabled("ok", False)
+
+        check = Gtk.CheckButton(label="I agree to behave like a responsible human.")
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        box.append(disclaimer_label)
+        box.append(check)
+        dialog.set_extra_child(box)
+
+        def on_toggle(_btn):
+            dialog.set_response_enabled("ok", check.get_active())
+
+        check.connect("toggled", on_toggle)
+        def on_response(_dlg, response):
+            if response == "ok" and check.get_active():
+                try:
+                    os.makedirs(os.path.dirname(flag_path), exist_ok=True)
+                    with open(flag_path, "w", encoding="utf-8") as f:
+                        f.write("ok")
+                except Exception:
+                    pass
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def install_actions(self):
+        self._add_action("donate", self.on_donate)
+        self._add_action("credits", self.on_credits)
+        self._add_action("license", self.on_license)
+        self._add_action("supported_sites", self.on_supported_sites)
+        self._add_action("check_updates", self.on_check_updates)
+
+    def _add_action(self, name, callback):
+        action = Gio.SimpleAction.new(name, None)
+        action.connect("activate", callback)
+        self.add_action(action)
+
+    def on_donate(self, _action, _param):
+        upi_id = "7868050070@superyes"
+        payee = GLib.uri_escape_string("GlassDrop", None, False)
+        uri = f"upi://pay?pa={upi_id}&pn={payee}&cu=INR"
+        dialog = Adw.MessageDialog.new(self.win, "Support GlassDrop", None)
+        dialog.set_body(
+            "Scan the QR code with any UPI app or use the UPI ID below.\n"
+            f"{upi_id}"
+        )
+
+        qr_path = os.path.join(os.path.dirname(__file__), "assets", "Donation.png")
+        if os.path.exists(qr_path):
+            qr_image = Gtk.Image.new_from_file(qr_path)
+            qr_image.set_pixel_size(220)
+            qr_image.set_halign(Gtk.Align.CENTER)
+            qr_image.set_valign(Gtk.Align.CENTER)
+            qr_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+            qr_box.set_halign(Gtk.Align.CENTER)
+            qr_box.append(qr_image)
+            dialog.set_extra_child(qr_box)
+
+        dialog.add_response("copy", "Copy UPI ID")
+        dialog.add_response("ok", "OK")
+        dialog.set_default_response("ok")
+        dialog.set_close_response("ok")
+
+        def on_response(_dlg, response):
+            if response == "copy":
+                clipboard = Gdk.Display.get_default().get_clipboard()
+                clipboard.set(upi_id)
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def on_credits(self, _action, _param):
+        dialog = Adw.MessageDialog.new(self.win, "Credits", None)
+        credits_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        credits_box.set_halign(Gtk.Align.CENTER)
+
+        logo_path = os.path.join(os.path.dirname(__file__), "assets", "GlassDrop.png")
+        if os.path.exists(logo_path):
+            logo = Gtk.Image.new_from_file(logo_path)
+            logo.set_pixel_size(110)
+            credits_box.append(logo)
+
+        credits_label = Gtk.Label()
+        credits_label.set_use_markup(True)
+        credits_label.set_wrap(True)
+        credits_label.set_justify(Gtk.Justification.CENTER)
+        credits_label.set_xalign(0.5)
+        credits_label.set_markup(
+            "<b>Built by</b> "
+            "<a href=\"https://github.com/Killersparrow1\">Milas</a>\n"
+            "<b>Powered by</b> "
+            "<a href=\"https://github.com/yt-dlp/yt-dlp\">yt-dlp</a>\n"
+            "<b>Assisted by</b> "
+            "<a href=\"https://github.com/openai/codex\">Codex</a>\n"
+            "<b>Supported sites</b> "
+            "<a href=\"https://github.com/yt-dlp/yt-dlp/blob/master/supportedsites.md\">List</a>"
+        )
+        credits_box.append(credits_label)
+        dialog.set_extra_child(credits_box)
+        dialog.add_response("ok", "OK")
+        dialog.set_default_response("ok")
+        dialog.set_close_response("ok")
+        dialog.present()
+
+    def on_license(self, _action, _param):
+        dialog = Adw.MessageDialog.new(self.win, "License (MIT)", None)
+
+        license_text = (
+            "MIT License\n\n"
+            "Copyright (c) 2026 Milas\n\n"
+            "Permission is hereby granted, free of charge, to any person obtaining a copy "
+            "of this software and associated documentation files (the \"Software\"), to deal "
+            "in the Software without restriction, including without limitation the rights "
+            "to use, copy, modify, merge, publish, distribute, sublicense, and/or sell "
+            "copies of the Software, and to permit persons to whom the Software is "
+            "furnished to do so, subject to the following conditions:\n\n"
+            "The above copyright notice and this permission notice shall be included in all "
+            "copies or substantial portions of the Software.\n\n"
+            "THE SOFTWARE IS PROVIDED \"AS IS\", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR "
+            "IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, "
+            "FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE "
+            "AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER "
+            "LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, "
+            "OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE."
+        )
+
+        label = Gtk.Label(label=license_text)
+        label.set_wrap(True)
+        label.set_selectable(True)
+        label.set_xalign(0.0)
+        label.add_css_class("license-text")
+
+        scroller = Gtk.ScrolledWindow()
+        scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scroller.set_min_content_height(260)
+        scroller.set_child(label)
+
+        dialog.set_extra_child(scroller)
+        dialog.add_response("ok", "OK")
+        dialog.set_default_response("ok")
+        dialog.set_close_response("ok")
+        dialog.present()
+
+    def on_supported_sites(self, _action, _param):
+        dialog = Adw.MessageDialog.new(self.win, "Supported Sites", None)
+
+        search_entry = Gtk.SearchEntry(placeholder_text="Search sites or domains")
+        count_label = Gtk.Label(label="Loading supported sites list...")
+        count_label.set_xalign(0.0)
+        count_label.add_css_class("queue-meta")
+
+        store = Gio.ListStore(item_type=SiteEntry)
+        terms = []
+        site_filter = Gtk.CustomFilter.new(lambda entry: matches(entry.site, terms))
+        filtered = Gtk.FilterListModel(model=store, filter=site_filter)
+        # Filter in chunks between frames instead of in one long pass per keystroke.
+        filtered.set_incremental(True)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self.on_site_setup)
+        factory.connect("bind", self.on_site_bind)
+        site_list = Gtk.ListView(model=Gtk.NoSelection(model=filtered), factory=factory)
+
+        scroller = Gtk.ScrolledWindow()
+        scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scroller.set_min_content_height(300)
+        scroller.set_child(site_list)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        box.append(search_entry)
+        box.append(count_label)
+        box.append(scroller)
+
+        dialog.set_extra_child(box)
+        dialog.add_response("ok", "OK")
+        dialog.set_default_response("ok")
+        dialog.set_close_response("ok")
+        dialog.present()
+        search_entry.grab_focus()
+
+        state = {"query": "", "source": ""}
+
+        def update_count(*_args):
+            total = store.get_n_items()
+            if not total:
+                return
+            shown = filtered.get_n_items()
+            text = f"{total} sites" if shown == total else f"{shown} of {total} sites"
+            count_label.set_text(f"{text} \u2022 {state['source']}")
+
+        def on_search(entry):
+            query = entry.get_text().strip().lower()
+            previous = state["query"]
+            state["query"] = query
+            terms[:] = query.split()
+            # Typing on only narrows the list, so GTK re-checks just the rows still shown.
+            if previous and query.startswith(previous):
+                change = Gtk.FilterChange.MORE_STRICT
+            elif query and previous.startswith(query):
+                change = Gtk.FilterChange.LESS_STRICT
+            else:
+                change = Gtk.FilterChange.DIFFERENT
+            site_filter.changed(change)
+
+        def show_sites(sites, source):
+            if sites is None:
+                count_label.set_text("Failed to load supported sites list. Check your connection.")
+                return False
+            state["source"] = source
+            store.splice(0, 0, [SiteEntry(site) for site in sites])
+            update_count()
+            return False
+
+        def load_list():
+            # The extractor index lists what the installed yt-dlp supports, offline; without
+            # the yt_dlp module (Flatpak) the published list is used instead.
+            index = self.load_extractor_index()
+            if index is not None:
+                source = f"yt-dlp {index.version}"
+            else:
+                source = "yt-dlp supportedsites.md"
+            GLib.idle_add(show_sites, load_sites(index), source)
+
+        filtered.connect("items-changed", update_count)
+        search_entry.connect("search-changed", on_search)
+        threading.Thread(target=load_list, daemon=True).start()
+
+    def on_site_setup(self, _factory, list_item):
+        row_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        row_box.add_css_class("queue-row")
+        row_box.name_label = Gtk.Label()
+        row_box.name_label.set_xalign(0.0)
+        row_box.name_label.set_ellipsize(Pango.EllipsizeMode.END)
+        row_box.meta_label = Gtk.Label()
+        row_box.meta_label.set_xalign(0.0)
+        row_box.meta_label.add_css_class("queue-meta")
+        row_box.meta_label.set_ellipsize(Pango.EllipsizeMode.END)
+        row_box.append(row_box.name_label)
+        row_box.append(row_box.meta_label)
+        list_item.set_child(row_box)
+
+    def on_site_bind(self, _factory, list_item):
+        row_box = list_item.get_child()
+        entry = list_item.get_item()
+        if entry is None:
+            return
+        site = entry.site
+        row_box.name_label.set_text(site["name"])
+        meta = [part for part in (site["domain"], site["description"]) if part]
+        if not site["working"]:
+            meta.append("Currently broken")
+        row_box.meta_label.set_text(" \u2022 ".join(meta))
+        row_box.meta_label.set_visible(bool(meta))
+
+    def on_check_updates(self, _action, _param):
+        url = "https://github.com/Killersparrow1/GlassDrop"
+        Gio.AppInfo.launch_default_for_uri(url)
+
+    def set_thumb_loading(self, loading):
+        if loading:
+            self.thumbnail.remove_css_class("thumb-loaded")
+            self.thumb_loading_box.set_visible(True)
+        else:
+            self.thumb_loading_box.set_visible(False)
+            self.thumbnail.add_css_class("thumb-loaded")
+
+    def load_css(self):
+        # Flatpak should use runtime theme defaults to avoid host theme/compositor quirks.
+        if os.environ.get("FLATPAK_ID"):
+            return
+        css_path = os.path.join(os.path.dirname(__file__), "ui", "style.css")
+        if not os.path.exists(css_path):
+            return
+        provider = Gtk.CssProvider()
+        try:
+            provider.load_from_path(css_path)
+        except GLib.Error:
+            return
+        display = Gdk.Display.get_default()
+        if display:
+            Gtk.StyleContext.add_provider_for_display(
+                display, provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+            )
+
+    def check_clipboard_on_start(self):
+        display = Gdk.Display.get_default()
+        if not display:
+            return
+        clipboard = display.get_clipboard()
+        clipboard.read_text_async(None, self.on_clipboard_start_text)
+
+    def on_clipboard_start_text(self, clipboard, result):
+        try:
+            text = clipboard.read_text_finish(result)
+        except GLib.Error:
+            return
+        if not text:
+            return
+        url = text.strip()
+        if not url.startswith("http"):
+            return
+        toast = Adw.Toast.new("Use clipboard URL?")
+        toast.set_button_label("Use")
+
+        def on_use(_toast):
+            self.url_entry.set_text(url)
+            self.fetch_info(self.url_entry)
+
+        toast.connect("button-clicked", on_use)
+        self.toast_overlay.add_toast(toast)
+
+
+    def on_speed_changed(self, _dropdown, _param):
+        selected = self.speed_dropdown.get_selected()
+        options = ["No limit", "1M", "2M", "5M"]
+        if selected < 0 or selected >= len(options):
+            self.speed_limit = None
+        else:
+            choice = options[selected]
+            self.speed_limit = None if choice == "No limit" else choice
+        self.bandwidth.total = parse_rate(self.speed_limit)
+        self.rebalance_bandwidth()
+
+    def on_connections_changed(self, _dropdown, _param):
+        selected = self.connections_dropdown.get_selected()
+        if 0 <= selected < len(self.connection_options):
+            self.connections = self.connection_options[selected]
+
+    def get_selected_format_id(self):
+        selected = self.format_dropdown.get_selected()
+        if selected < 0 or selected >= len(self.dropdown_format_ids):
+            return None
+        return self.dropdown_format_ids[selected]
+
+    def get_selected_preset(self):
+        selected = self.presets_dropdown.get_selected()
+        if selected < 0 or selected >= len(self.preset_options):
+            return None
+        return self.preset_options[selected]
+
+    def enqueue_download(self, *args, **kwargs):
+        return self.enqueue_items([self.make_queue_item(*args, **kwargs)])
+
+    def make_queue_item(self, url, format_id, title, format_label, format_selector=None, post_args=None,
+                        thumbnail=None, directory=None, store_id=None, status_text="Queued", duration=None,
+                        archive_id=None, use_archive=True):
+        item = new_queue_item(
+            url,
+            format_id,
+            title,
+            format_label,
+            format_selector=format_selector,
+            post_args=post_args,
+            thumbnail=thumbnail,
+            info_path=self.info_json_store.lookup(url),
+            directory=directory or os.getcwd(),
+            archive_id=archive_id,
+            archive_path=self.archive_path if use_archive else None
+        )
+        item["store_id"] = store_id
+        item["duration"] = duration
+        if self.offload_postprocessing:
+            item["post_job"] = audio_job(post_args)
+        item["row"] = QueueRow(title, format_label, thumbnail, status_text)
+        item["row"].item = item
+        return item
+
+    def enqueue_items(self, items):
+        # Items identical to one already queued or downloading (same URL and format) are dropped.
+        added = []
+        for item in items:
+            key = item_key(item)
+            if key in self.queue_keys:
+                continue
+            self.queue_keys.add(key)
+            if item["store_id"] is None:
+                item["store_id"] = self.queue_store.add(item)
+            added.append(item)
+        # One splice per batch, so queueing a whole playlist is a single model change.
+        self.queue_rows.splice(self.queue_rows.get_n_items(), 0, [item["row"] for item in added])
+        self.queue.extend(added)
+        self.process_next_download()
+        return len(added)
+
+    def is_archived(self, entry_id):
+        return self.archive is not None and entry_id in self.archive
+
+    def on_queue_setup(self, _factory, list_item):
+        row_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        row_box.add_css_class("queue-row")
+        row_box.thumb = self.new_row_thumbnail()
+
+        row_box.title_label = Gtk.Label()
+        row_box.title_label.set_xalign(0.0)
+        row_box.title_label.set_hexpand(True)
+        row_box.title_label.set_ellipsize(Pango.EllipsizeMode.END)
+
+        row_box.format_label = Gtk.Label()
+        row_box.format_label.add_css_class("queue-meta")
+        row_box.format_label.set_ellipsize(Pango.EllipsizeMode.END)
+
+        row_box.status_label = Gtk.Label()
+        row_box.status_label.add_css_class("queue-status")
+
+        row_box.progress_bar = Gtk.ProgressBar()
+        row_box.progress_bar.add_css_class("queue-progress")
+        row_box.progress_bar.set_valign(Gtk.Align.CENTER)
+        row_box.progress_bar.set_size_request(90, -1)
+
+        row_box.resume_button = Gtk.Button(icon_name="media-playback-start-symbolic")
+        row_box.resume_button.add_css_class("flat")
+        row_box.resume_button.set_tooltip_text("Resume")
+        row_box.resume_button.set_valign(Gtk.Align.CENTER)
+        row_box.resume_button.connect("clicked", lambda _button: self.resume_download(row_box.row.item))
+
+        row_box.append(row_box.thumb)
+        row_box.append(row_box.title_label)
+        row_box.append(row_box.format_label)
+        row_box.append(row_box.progress_bar)
+        row_box.append(row_box.status_label)
+        row_box.append(row_box.resume_button)
+        row_box.row = None
+        row_box.bindings = []
+        list_item.set_child(row_box)
+
+    def on_queue_bind(self, _factory, list_item):
+        row_box = list_item.get_child()
+        row = list_item.get_item()
+        row_box.row = row
+        flags = GObject.BindingFlags.SYNC_CREATE
+        row_box.bindings = [
+            row.bind_property("title", row_box.title_label, "label", flags),
+            row.bind_property("format_label", row_box.format_label, "label", flags),
+            row.bind_property("status", row_box.status_label, "label", flags),
+            row.bind_property("fraction", row_box.progress_bar, "fraction", flags),
+            row.bind_property("paused", row_box.resume_button, "visible", flags),
+        ]
+        self.show_row_thumbnail(row_box.thumb, row.props.thumbnail or None)
+
+    def on_queue_unbind(self, _factory, list_item):
+        row_box = list_item.get_child()
+        for binding in row_box.bindings:
+            binding.unbind()
+        row_box.bindings = []
+        row_box.row = None
+
+    def process_next_download(self):
+        started = []
+        while self.queue:
+            index = self.scheduler.pick(self.queue)
+            if index is None:
+                self.schedule_wakeup()
+                break
+            item = self.queue.pop(index)
+            self.scheduler.start(item)
+            # Auto only tunes DASH/HLS fragment concurrency; plain files stay on one stream.
+            item["tuned"] = self.connections == "auto"
+            item["connections"] = (
+                self.tuner.suggest(tuning_key(item)) if item["tuned"] else self.connections
+            )
+            item["row"].props.status = "Downloading"
+            self.queue_store.set_status(item["store_id"], "downloading")
+            item["started"] = time.time()
+            started.append(item)
+        # Every slot change lands here, so the budget is split again before the new ones run.
+        self.rebalance_bandwidth()
+        for item in started:
+            threading.Thread(
+                target=self.download_video,
+                args=(item,),
+                daemon=True
+            ).start()
+
+    def rebalance_bandwidth(self):
+        # An even share of the budget for each running download, so together they never
+        # exceed it. Re-run when the peak schedule moves into or out of a window, and when
+        # a restart held back by set_speed_limit() is allowed.
+        active = self.scheduler.active
+        limit = self.bandwidth.limit_arg(len(active))
+        waits = [set_speed_limit(item, limit) for item in active]
+        if self.bandwidth_timer is not None:
+            GLib.source_remove(self.bandwidth_timer)
+            self.bandwidth_timer = None
+        if active:
+            waits.append(self.bandwidth.next_change())
+        waits = [wait for wait in waits if wait is not None]
+        if waits:
+            self.bandwidth_timer = GLib.timeout_add_seconds(int(min(waits)) + 1, self.on_bandwidth_timer)
+
+    def on_bandwidth_timer(self):
+        self.bandwidth_timer = None
+        self.rebalance_bandwidth()
+        return False
+
+    def schedule_wakeup(self):
+        # Items waiting on a backoff or a host cooldown need a timer; nothing else would start them.
+        delay = self.scheduler.next_ready_in(self.queue)
+        if delay is None:
+            return
+        wake_at = time.monotonic() + delay
+        if self.wakeup_at is not None and self.wakeup_at <= wake_at:
+            return
+        self.wakeup_at = wake_at
+
+        def on_wakeup():
+            if self.wakeup_at == wake_at:
+                self.wakeup_at = None
+                self.process_next_download()
+            return False
+
+        GLib.timeout_add(int(delay * 1000) + 50, on_wakeup)
+
+    def retry_later(self, item, kind):
+        item["attempts"] = item.get("attempts", 0) + 1
+        delay = backoff_delay(item["attempts"])
+        if kind == "throttled":
+            self.scheduler.cooldown(item["host"], delay)
+        self.scheduler.finish(item)
+        item["not_before"] = time.monotonic() + delay
+        item["row"].props.status = f"Retry {item['attempts']} in {int(delay)}s"
+        item["row"].props.fraction = 0.0
+        self.queue_store.set_status(item["store_id"], "queued")
+        self.queue.insert(0, item)
+        self.process_next_download()
+
+    def refresh_info_json(self, url):
+        # Cheap with the warm in-process engine: only the page is re-read, nothing is downloaded.
+        try:
+            info = self.engine.extract_info(url)
+        except FetchError:
+            return None
+        return self.info_json_store.save(url, info)
+
+    def update_item_progress(self, item, fraction=None, text=None, detail=None):
+        active = self.scheduler.active
+        if fraction is not None:
+            item["fraction"] = fraction
+            item["row"].props.fraction = fraction
+            if active:
+                self.progress.set_fraction(
+                    sum(i["fraction"] for i in active) / len(active)
+                )
+        if text is not None:
+            item["row"].props.status = text
+        if detail is not None:
+            if len(active) > 1:
+                self.status_label.set_text(f"Downloading {len(active)} items...")
+            else:
+                self.status_label.set_text(detail)
+
+    def add_history_item(self, item, path):
+        size = None
+        if path:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                pass
+        self.history_store.add(
+            item["url"],
+            item["title"],
+            item["format_label"],
+            path,
+            thumbnail=item.get("thumbnail"),
+            size=size,
+            duration=item.get("duration"),
+            started=item.get("started")
+        )
+        # Before attach_history the model does not exist yet; it reads the row when attached.
+        if self.history_model is not None:
+            self.history_model.prepend()
+
+    def on_history_setup(self, _factory, list_item):
+        row_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        row_box.add_css_class("history-row")
+        row_box.thumb = self.new_row_thumbnail()
+
+        text_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        text_box.set_hexpand(True)
+        text_box.set_valign(Gtk.Align.CENTER)
+        row_box.title_label = Gtk.Label()
+        row_box.title_label.set_xalign(0.0)
+        row_box.title_label.set_ellipsize(Pango.EllipsizeMode.END)
+        row_box.meta_label = Gtk.Label()
+        row_box.meta_label.set_xalign(0.0)
+        row_box.meta_label.add_css_class("queue-meta")
+        row_box.meta_label.set_ellipsize(Pango.EllipsizeMode.END)
+        text_box.append(row_box.title_label)
+        text_box.append(row_box.meta_label)
+
+        open_button = Gtk.Button(label="Open Folder")
+        open_button.add_css_class("history-button")
+
+        def on_open(_btn):
+            entry = list_item.get_item()
+            path = entry.record["path"] if entry else None
+            if not path:
+                return
+            folder = os.path.dirname(path)
+            Gio.AppInfo.launch_default_for_uri(f"file://{folder}")
+
+        open_button.connect("clicked", on_open)
+
+        row_box.append(row_box.thumb)
+        row_box.append(text_box)
+        row_box.append(open_button)
+        list_item.set_child(row_box)
+
+    def on_history_bind(self, _factory, list_item):
+        row_box = list_item.get_child()
+        entry = list_item.get_item()
+        if entry is None:
+            return
+        record = entry.record
+        row_box.title_label.set_text(record["title"] or record["url"])
+        meta = [record["format_label"] or ""]
+        if record["size"]:
+            meta.append(format_bytes(record["size"]))
+        if record["duration"]:
+            meta.append(format_eta(record["duration"]))
+        meta.append(time.strftime("%Y-%m-%d %H:%M", time.localtime(record["finished"])))
+        row_box.meta_label.set_text(" \u2022 ".join(part for part in meta if part))
+        self.show_row_thumbnail(row_box.thumb, record["thumbnail"])
+
+    def on_history_search(self, entry):
+        if self.history_model is not None:
+            self.history_model.set_query(entry.get_text())
+
+    def clear_history(self, _button):
+        self.history_store.clear()
+        if self.history_model is not None:
+            self.history_model.reload()
+
+    def show_error_popup(self, title, error_text):
+        dialog = Adw.MessageDialog.new(self.win, title, None)
+
+        text_view = Gtk.TextView()
+        text_view.set_editable(False)
+        text_view.set_cursor_visible(False)
+        text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
+        text_view.add_css_class("license-text")
+
+        buffer = text_view.get_buffer()
+        buffer.set_text(error_text)
+
+        scroller = Gtk.ScrolledWindow()
+        scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scroller.set_min_content_height(200)
+        scroller.set_child(text_view)
+
+        dialog.set_extra_child(scroller)
+        dialog.add_response("copy", "Copy")
+        dialog.add_response("ok", "OK")
+        dialog.set_default_response("ok")
+        dialog.set_close_response("ok")
+
+        def on_response(_dlg, response):
+            if response == "copy":
+                clipboard = Gdk.Display.get_default().get_clipboard()
+                clipboard.set(error_text)
+
+        dialog.connect("response", on_response)
+        dialog.present()
+    def add_key_controller(self):
+        key_controller = Gtk.EventControllerKey()
+        key_controller.connect("key-pressed", self.on_key_pressed)
+        self.win.add_controller(key_controller)
+
+    def on_key_pressed(self, _controller, keyval, _keycode, _state):
+        if keyval == Gdk.KEY_Escape:
+            self.clear_ui()
+            return True
+        return False
+
+    def add_drop_target(self):
+        drop_target = Gtk.DropTarget.new(
+            Gdk.ContentFormats.new_for_gtype(GObject.TYPE_STRING),
+            Gdk.DragAction.COPY
+        )
+
+        def on_drop(_target, value, _x, _y):
+            if not value:
+                return False
+            return self.open_links(value)
+
+        drop_target.connect("drop", on_drop)
+        self.win.add_controller(drop_target)
+
+    def on_paste_clicked(self, _button):
+        display = Gdk.Display.get_default()
+        if not display:
+            return
+        clipboard = display.get_clipboard()
+        clipboard.read_text_async(None, self.on_clipboard_text)
+
+    def on_clipboard_text(self, clipboard, result):
+        try:
+            text = clipboard.read_text_finish(result)
+        except GLib.Error:
+            return
+        if text:
+            self.open_links(text)
+
+    def open_links(self, text):
+        # One link behaves like typing it in; several are fetched together into the pending list.
+        urls = [url for url in split_urls(text) if not url_problem(url)]
+        if not urls:
+            self.status_label.set_text("Not a valid link")
+            return False
+        if len(urls) == 1:
+            self.url_entry.set_text(urls[0])
+            self.fetch_info(self.url_entry)
+        else:
+            self.fetch_many(urls)
+        return True
+
+    # AUTO FETCH
+    def fetch_info(self, entry):
+
+        url = self.url_entry.get_text().strip()
+        if not url:
+            return
+        # Malformed links are turned away here instead of by a yt-dlp run.
+        problem = url_problem(url)
+        if problem:
+            self.status_label.set_text(problem)
+            return
+
+        self.cancel_fetch()
+        self.fetch_cancel = threading.Event()
+        token = self.fetch_token
+        self.current_url = url
+        self.reset_pending()
+        if self.is_playlist_url(url):
+            target = self.get_playlist_entries
+        else:
+            self.set_thumb_loading(True)
+            target = self.get_video_info
+        threading.Thread(
+            target=target,
+            args=(url, token, self.fetch_cancel),
+            daemon=True
+        ).start()
+
+    def fetch_many(self, urls):
+        self.cancel_fetch()
+        self.fetch_cancel = threading.Event()
+        token = self.fetch_token
+        self.current_url = ""
+        self.url_entry.set_text("")
+        self.reset_pending()
+        threading.Thread(
+            target=self.get_link_entries,
+            args=(urls, token, self.fetch_cancel),
+            daemon=True
+        ).start()
+
+    def cancel_fetch(self):
+        # Bumping the token hides stale results; setting the event stops the work behind them.
+        self.fetch_token += 1
+        if self.fetch_cancel is not None:
+            self.fetch_cancel.set()
+            self.fetch_cancel = None
+
+    def safe_idle(self, token, func, *args):
+        self.ui.call(func, *args, token=token)
+
+    def get_video_info(self, url, token, cancel):
+
+        allow_stale = self.settings.get("info_cache_stale_while_revalidate", True)
+        cached, fresh = self.info_cache.get(url, allow_stale=allow_stale)
+        if cached is not None:
+            self.apply_info(url, cached, token, cancel)
+            if fresh:
+                return
+            self.safe_idle(token, self.status_label.set_text, "Refreshing info...")
+        else:
+            self.safe_idle(token, self.status_label.set_text, "Fetching info...")
+
+        try:
+            data = self.engine.extract_info(url, cancel=cancel)
+        except FetchCancelled:
+            return
+        except FetchError as e:
+            if cached is not None:
+                self.safe_idle(token, self.status_label.set_text, "Info Loaded (cached)")
+                return
+            error_text = str(e)
+            self.safe_idle(token, self.status_label.set_text, "Failed to fetch info")
+            self.safe_idle(token, self.set_thumb_loading, False)
+            self.safe_idle(token, self.show_error_popup, "Fetch Failed", error_text)
+            return
+
+        self.info_json_store.save(url, data)
+        info = self.info_cache.put(url, data)
+        if info == cached:
+            self.safe_idle(token, self.status_label.set_text, "Info Loaded")
+            return
+        self.apply_info(url, info, token, cancel)
+
+    def apply_info(self, url, data, token, cancel):
+        # Runs on the fetch thread. The table and labels are built here; show_info() stores
+        # them on the main thread, behind the token, so a superseded fetch changes nothing.
+        if cancel.is_set() or token != self.fetch_token:
+            return
+        thumbnail_url = data.get("thumbnail", "")
+
+        # Start the image request before the format work below so both overlap.
+        if thumbnail_url:
+            self.thumbnails.load(
+                thumbnail_url, 1040, 585,
+                lambda texture: self.safe_idle(token, self.set_thumbnail_texture, texture),
+                cancel=cancel
+            )
+        else:
+            self.safe_idle(token, self.set_thumb_loading, False)
+
+        table = FormatTable(data.get("formats", []), data.get("duration"))
+
+        # The dropdown shows each format's estimated size and download time; queue rows
+        # keep the plain label.
+        throughput = self.expected_throughput(url)
+        format_labels = []
+        for label, format_id in table.items():
+            estimate = describe_estimate(table.get(format_id).size, throughput)
+            format_labels.append(f"{label} \u2022 {estimate}" if estimate else label)
+
+        choice = self.pick_auto_quality(table, throughput)
+        if choice:
+            auto_label = f"Auto: {choice['label']} \u2022 {describe_estimate(choice['size'], throughput)}"
+        else:
+            auto_label = "Auto (no size info: best)"
+        self.safe_idle(token, self.show_info, data, table, format_labels, auto_label)
+
+    def show_info(self, data, table, format_labels, auto_label):
+        title = data.get("title", "Unknown Title")
+        self.current_title = title
+        self.current_thumbnail = data.get("thumbnail") or None
+        self.current_duration = data.get("duration")
+        self.current_archive_id = info_archive_id(data)
+        self.format_table = table
+        self.formats = table.items()
+        self.dropdown_format_ids = [format_id for _label, format_id in self.formats]
+        self.title_label.set_text(title)
+
+        self.download_button.set_sensitive(bool(format_labels))
+        self.presets_row.set_sensitive(bool(format_labels))
+        if format_labels:
+            self.replace_dropdown(Gtk.DropDown.new_from_strings(format_labels))
+
+        self.preset_options = PRESETS
+        preset_labels = [auto_label if p["kind"] == "auto" else p["label"] for p in self.preset_options]
+        self.replace_preset_dropdown(Gtk.DropDown.new_from_strings(preset_labels))
+        self.status_label.set_text("Info Loaded")
+
+    def set_thumbnail_texture(self, texture):
+        if texture is not None:
+            self.thumbnail.set_paintable(texture)
+        self.set_thumb_loading(False)
+
+    def new_row_thumbnail(self):
+        picture = Gtk.Picture()
+        picture.set_size_request(64, 36)
+        picture.set_content_fit(Gtk.ContentFit.COVER)
+        picture.set_valign(Gtk.Align.CENTER)
+        picture.add_css_class("row-thumb")
+        picture.thumbnail_url = None
+        return picture
+
+    def show_row_thumbnail(self, picture, thumbnail_url):
+        # Recycled list rows can be rebound before the image arrives, so delivery checks the URL.
+        picture.thumbnail_url = thumbnail_url
+        picture.set_paintable(None)
+        if thumbnail_url:
+            # Rows only reuse images that are already cached; they never trigger a download.
+            self.thumbnails.load(
+                thumbnail_url, 128, 72,
+                lambda texture: self.ui.call(self.set_row_thumbnail, picture, thumbnail_url, texture),
+                cache_only=True
+            )
+
+    def set_row_thumbnail(self, picture, thumbnail_url, texture):
+        if texture is not None and picture.thumbnail_url == thumbnail_url:
+            picture.set_paintable(texture)
+
+    def replace_dropdown(self, new_dropdown):
+        parent = self.format_dropdown.get_parent()
+        parent.remove(self.format_dropdown)
+        self.format_dropdown = new_dropdown
+        parent.insert_child_after(self.format_dropdown, self.presets_row)
+        if self.format_dropdown.get_n_items() > 0:
+            self.format_dropdown.set_selected(0)
+
+    def replace_preset_dropdown(self, new_dropdown):
+        parent = self.presets_dropdown.get_parent()
+        parent.remove(self.presets_dropdown)
+        self.presets_dropdown = new_dropdown
+        parent.insert_child_after(self.presets_dropdown, self.presets_label)
+        if self.presets_dropdown.get_n_items() > 0:
+            self.presets_dropdown.set_selected(0)
+
+    def start_download(self, button):
+
+        if self.playlist_mode:
+            self.enqueue_pending()
+            return
+
+        url = self.current_url or self.url_entry.get_text().strip()
+        if not url:
+            return
+
+        preset = self.get_selected_preset()
+        format_id = None
+        format_selector = None
+        post_args = None
+        preset_label = "Selected format"
+
+        if preset:
+            preset_label = preset.get("label", preset_label)
+            kind = preset.get("kind")
+            if kind == "selected":
+                format_id = self.get_selected_format_id()
+            elif kind in ("selector", "audio_format"):
+                format_selector = preset.get("format")
+                post_args = preset.get("post")
+            elif kind == "auto":
+                # Chosen again at click time: the speed estimate may have moved since the fetch.
+                choice = self.pick_auto_quality(self.format_table, self.expected_throughput(url))
+                if choice:
+                    format_selector = choice["format"]
+                    preset_label = f"Auto \u2022 {choice['label']}"
+                else:
+                    format_selector = "bestvideo+bestaudio/best"
+
+        if not format_id and not format_selector:
+            return
+
+        selected = self.format_dropdown.get_selected()
+        format_label = (
+            self.formats[selected][0]
+            if 0 <= selected < len(self.formats)
+            else "Format"
+        )
+        title = self.current_title or url
+        display_label = format_label if (preset and preset.get("kind") == "selected") else preset_label
+        entry_id = self.current_archive_id
+
+        def enqueue(use_archive=True):
+            added = self.enqueue_download(
+                url,
+                format_id,
+                title,
+                display_label,
+                format_selector=format_selector,
+                post_args=post_args,
+                thumbnail=self.current_thumbnail,
+                duration=self.current_duration,
+                archive_id=entry_id,
+                use_archive=use_archive
+            )
+            if not added:
+                self.status_label.set_text("Already in queue")
+
+        # Checked before anything is spawned; yt-dlp would otherwise extract the page just to skip it.
+        if self.is_archived(entry_id):
+            self.status_label.set_text("Already downloaded")
+            toast = Adw.Toast.new("This video is in the download archive")
+            toast.set_button_label("Download Again")
+            toast.connect("button-clicked", lambda _toast: enqueue(use_archive=False))
+            self.toast_overlay.add_toast(toast)
+            return
+        enqueue()
+
+    def get_playlist_entries(self, url, token, cancel):
+        self.safe_idle(token, self.begin_playlist)
+        count = 0
+        try:
+            for entry in self.engine.iter_playlist(url, cancel=cancel):
+                with self.pending_lock:
+                    self.pending_buffer.append(entry)
+                self.ui.post(("pending", token), self.flush_pending, token=token)
+                count += 1
+        except FetchCancelled:
+            return
+        except FetchError as e:
+            if count == 0:
+                self.safe_idle(token, self.status_label.set_text, "Failed to fetch playlist")
+                self.safe_idle(token, self.show_error_popup, "Fetch Failed", str(e))
+                return
+            # The entries listed so far stay queueable; the status says the list is incomplete.
+            reason = (str(e).strip().splitlines() or ["unknown error"])[-1]
+            self.safe_idle(
+                token, self.status_label.set_text,
+                f"Playlist Incomplete \u2022 {count} entries \u2022 listing failed: {reason}"
+            )
+            return
+        self.safe_idle(token, self.status_label.set_text, f"Playlist Loaded \u2022 {count} entries")
+
+    def get_link_entries(self, urls, token, cancel):
+        self.safe_idle(token, self.begin_playlist, "Links")
+        lock = threading.Lock()
+        counts = {"entries": 0}
+        errors = []
+
+        def fetch(url):
+            try:
+                if self.is_playlist_url(url):
+                    entries = self.engine.iter_playlist(url, cancel=cancel)
+                else:
+                    entries = [self.link_entry(url, cancel)]
+                for entry in entries:
+                    with self.pending_lock:
+                        self.pending_buffer.append(entry)
+                    self.ui.post(("pending", token), self.flush_pending, token=token)
+                    with lock:
+                        counts["entries"] += 1
+            except FetchCancelled:
+                return
+            except FetchError as e:
+                with lock:
+                    errors.append(str(e))
+
+        fetch_all(
+            urls,
+            fetch,
+            cancel,
+            workers=self.settings.get("metadata_workers", 4),
+            per_host=self.settings.get("metadata_per_host", 2)
+        )
+        if cancel.is_set():
+            return
+        count = counts["entries"]
+        if count == 0 and errors:
+            self.safe_idle(token, self.status_label.set_text, "Failed to fetch links")
+            self.safe_idle(token, self.show_error_popup, "Fetch Failed", errors[0])
+            return
+        status = f"Links Loaded \u2022 {count} entries"
+        if errors:
+            status += f" \u2022 {len(errors)} links failed"
+        self.safe_idle(token, self.status_label.set_text, status)
+
+    def link_entry(self, url, cancel):
+        # A single video from a multi-link paste, stored in the same caches a normal fetch uses.
+        info, _fresh = self.info_cache.get(url)
+        if info is None:
+            data = self.engine.extract_info(url, cancel=cancel, shared=False)
+            self.info_json_store.save(url, data)
+            info = self.info_cache.put(url, data)
+        return {
+            "url": url,
+            "id": info.get("id"),
+            "ie_key": info.get("extractor_key"),
+            "title": info.get("title"),
+            "duration": info.get("duration"),
+            "thumbnail": info.get("thumbnail"),
+        }
+
+    def begin_playlist(self, title="Playlist"):
+        self.playlist_mode = True
+        self.pending_title = title
+        self.current_title = ""
+        self.title_label.set_text(f"Loading {title.lower()}...")
+        self.status_label.set_text(f"Fetching {title.lower()}...")
+        self.preset_options = BULK_PRESETS
+        self.replace_preset_dropdown(
+            Gtk.DropDown.new_from_strings([p["label"] for p in self.preset_options])
+        )
+        self.replace_dropdown(Gtk.DropDown.new_from_strings(["Formats are chosen per video"]))
+        self.format_table = FormatTable([])
+        self.formats = []
+        self.dropdown_format_ids = []
+        self.presets_row.set_sensitive(True)
+        self.download_button.set_label("Download All")
+        self.pending_label.set_text(title)
+        self.pending_box.set_visible(True)
+
+    def flush_pending(self):
+        with self.pending_lock:
+            batch = self.pending_buffer
+            self.pending_buffer = []
+        if not batch:
+            return
+        limit = self.settings.get("playlist_preview_rows", 200)
+        for entry in batch:
+            if len(self.pending_entries) < limit:
+                row = Gtk.ListBoxRow()
+                label = Gtk.Label(label=entry.get("title") or entry["url"])
+                label.set_xalign(0.0)
+                label.set_ellipsize(Pango.EllipsizeMode.END)
+                label.add_css_class("queue-row")
+                row.set_child(label)
+                self.pending_list.append(row)
+            self.pending_entries.append(entry)
+        count = len(self.pending_entries)
+        hidden = count - min(count, limit)
+        self.pending_more_label.set_text(f"and {hidden} more")
+        self.pending_more_label.set_visible(hidden > 0)
+        self.pending_label.set_text(f"{self.pending_title} \u2022 {count} entries")
+        self.title_label.set_text(f"{count} videos found")
+        self.download_button.set_sensitive(True)
+
+    def enqueue_pending(self):
+        self.flush_pending()
+        preset = self.get_selected_preset()
+        if not preset or not self.pending_entries:
+            return
+        items = []
+        archived = 0
+        for entry in self.pending_entries:
+            entry_id = archive_id(entry.get("ie_key"), entry.get("id"))
+            if self.is_archived(entry_id):
+                archived += 1
+                continue
+            # Formats are resolved by yt-dlp when the item actually starts downloading.
+            items.append(self.make_queue_item(
+                entry["url"],
+                None,
+                entry.get("title") or entry["url"],
+                preset["label"],
+                format_selector=preset.get("format"),
+                post_args=preset.get("post"),
+                thumbnail=entry.get("thumbnail"),
+                duration=entry.get("duration"),
+                archive_id=entry_id
+            ))
+        group = {"total": 0, "finished": 0, "failed": []}
+        for item in items:
+            item["group"] = group
+        added = self.enqueue_items(items)
+        group["total"] = added
+        status = f"Queued {added} videos"
+        if archived:
+            status += f" \u2022 {archived} already downloaded"
+        if len(items) > added:
+            status += f" \u2022 {len(items) - added} already in queue"
+        self.status_label.set_text(status)
+
+    def reset_pending(self):
+        self.playlist_mode = False
+        with self.pending_lock:
+            self.pending_buffer = []
+        self.pending_entries = []
+        child = self.pending_list.get_first_child()
+        while child:
+            self.pending_list.remove(child)
+            child = self.pending_list.get_first_child()
+        self.pending_more_label.set_visible(False)
+        self.pending_box.set_visible(False)
+        self.download_button.set_label("Download")
+
+    def download_video(self, item):
+
+        url = item["url"]
+        info_path = item.get("info_path")
+        if info_path and self.info_json_store.lookup(url) != info_path:
+            info_path = None
+
+        self.ui.post("status", self.status_label.set_text, "Downloading...")
+
+        returncode, dest_path, error_tail = self.run_download(item, info_path)
+        kind = classify_error(error_tail, info_expiry(info_path)) if returncode != 0 else None
+        if kind == "expired" and not item.get("paused") and not item.get("reextracted"):
+            # The signed stream URLs went stale: fetch a fresh info document and retry right away.
+            item["reextracted"] = True
+            if info_path:
+                self.info_json_store.discard(info_path)
+            info_path = self.refresh_info_json(url)
+            returncode, dest_path, error_tail = self.run_download(item, info_path)
+            kind = classify_error(error_tail, info_expiry(info_path)) if returncode != 0 else None
+        if kind in ("transient", "throttled") and not item.get("paused") \
+                and item.get("attempts", 0) < self.max_retries:
+            self.ui.call(self.retry_later, item, kind)
+            return
+
+        job = item.get("post_job")
+        if returncode == 0 and job and dest_path and not item.get("paused"):
+            self.ui.call(self.begin_postprocess, item)
+            self.postprocessor.submit(
+                item,
+                dest_path,
+                job,
+                lambda: self.ui.post(
+                    ("progress", id(item)),
+                    self.update_item_progress, item, None, f"Converting to {job['audio_format'].upper()}"
+                ),
+                lambda *result: self.finish_conversion(item, *result)
+            )
+            return
+
+        self.finish_download(item, returncode, dest_path, error_tail)
+
+    def finish_conversion(self, item, returncode, dest_path, error_tail):
+        # yt-dlp was not given the archive for this item (build_download_cmd), so a failed or
+        # interrupted conversion is tried again next time instead of being skipped as done.
+        if returncode == 0 and item.get("archive_path") and item.get("archive_id"):
+            record_archive_id(item["archive_path"], item["archive_id"])
+        self.finish_download(item, returncode, dest_path, error_tail)
+
+    def begin_postprocess(self, item):
+        # The network stage is done: free the download slot while the file waits for a converter.
+        self.scheduler.finish(item)
+        self.postprocessing.append(item)
+        item["row"].props.status = "Waiting to convert"
+        self.process_next_download()
+
+    def run_download(self, item, info_path):
+        def on_progress(event):
+            parts = event.summary()
+            row_text = " \u2022 ".join(parts) or "Downloading"
+            if event.eta is not None:
+                parts.append(f"ETA {format_eta(event.eta)}")
+            detail = " \u2022 ".join(["Downloading..."] + parts)
+            self.ui.post(
+                ("progress", id(item)),
+                self.update_item_progress, item, event.fraction, row_text, detail
+            )
+
+        result = run_download(item, info_path, on_progress)
+        if self.connections == "auto" and not item.get("paused"):
+            self.tuner.record(tuning_key(item), item["connections"], item.get("stats"))
+        if result[0] == 0:
+            self.throughput.record(item["host"], item.get("stats"))
+        return result
+
+    def expected_throughput(self, url):
+        # Speed a new download from this site would likely get: its recent downloads,
+        # capped by its share of the speed limit alongside the ones running now.
+        speed = self.throughput.estimate(host_of(url))
+        concurrency = min(self.scheduler.max_active, len(self.scheduler.active) + 1)
+        share = self.bandwidth.share(concurrency)
+        if share and (speed is None or share < speed):
+            return share
+        return speed
+
+    def pick_auto_quality(self, table, throughput):
+        minutes = self.settings.get("auto_quality_minutes")
+        max_mb = self.settings.get("auto_quality_max_mb")
+        return choose_quality(
+            table.choices,
+            throughput,
+            max_seconds=minutes * 60 if minutes else None,
+            max_bytes=max_mb * 1024 * 1024 if max_mb else None
+        )
+
+    def finish_download(self, item, returncode, dest_path, error_tail):
+        if item.get("paused"):
+            self.ui.call(self.pause_download, item)
+            return
+        error_text = "\n".join(error_tail) if error_tail else "Download failed."
+        group = item.get("group")
+        if returncode != 0 and group is None:
+            self.safe_idle(self.fetch_token, self.show_error_popup, "Download Failed", error_text)
+
+        if dest_path:
+            dest_path = os.path.abspath(dest_path)
+        status_text = "Download Complete" if returncode == 0 else "Download Failed"
+
+        def finish():
+            self.scheduler.finish(item)
+            if item in self.postprocessing:
+                self.postprocessing.remove(item)
+            self.queue_keys.discard(item_key(item))
+            self.queue_store.remove(item["store_id"])
+            item["row"].props.status = "Done" if returncode == 0 else "Failed"
+            item["row"].props.fraction = 1.0 if returncode == 0 else 0.0
+            if returncode == 0:
+                self.add_history_item(item, dest_path)
+            if group is not None:
+                self.finish_group_item(group, item, returncode, error_text)
+            if not self.scheduler.active:
+                self.status_label.set_text(status_text)
+                self.progress.set_fraction(0.0)
+            self.process_next_download()
+
+        self.ui.call(finish)
+
+    def finish_group_item(self, group, item, returncode, error_text):
+        # Bulk runs report failures once, when the last item is done, instead of one popup each.
+        group["finished"] += 1
+        if returncode != 0:
+            group["failed"].append((item["title"], error_text.splitlines()[-1]))
+        if group["finished"] < group["total"] or not group["failed"]:
+            return
+        lines = [f"{title}\n  {error}" for title, error in group["failed"]]
+        self.show_error_popup(
+            f"{len(group['failed'])} of {group['total']} downloads failed",
+            "\n".join(lines)
+        )
+
+    def pause_download(self, item):
+        # Stopped by the user rather than failed: keep the row so it resumes on next start.
+        self.scheduler.finish(item)
+        if item in self.postprocessing:
+            self.postprocessing.remove(item)
+        self.queue_keys.discard(item_key(item))
+        self.queue_store.set_status(item["store_id"], "paused")
+        item["row"].props.status = "Paused"
+        item["row"].props.paused = True
+        if item not in self.paused_items:
+            self.paused_items.append(item)
+        if not self.scheduler.active:
+            self.progress.set_fraction(0.0)
+        self.process_next_download()
+
+    def resume_download(self, item):
+        # Back into the queue; yt-dlp continues from the .part file in the item's directory.
+        if item not in self.paused_items:
+            return
+        self.paused_items.remove(item)
+        item["row"].props.paused = False
+        key = item_key(item)
+        if key in self.queue_keys:
+            # The same download was queued again while this one was paused.
+            item["row"].props.status = "Already queued"
+            self.queue_store.remove(item["store_id"])
+            return
+        self.queue_keys.add(key)
+        item["paused"] = False
+        item.pop("restart", None)
+        item["row"].props.status = "Queued"
+        self.queue_store.set_status(item["store_id"], "queued")
+        self.queue.append(item)
+        self.process_next_download()
+
+    def clear_ui(self):
+        self.cancel_fetch()
+        self.reset_pending()
+        self.stop_active()
+
+        self.url_entry.set_text("")
+        self.title_label.set_text("")
+        self.current_url = ""
+        self.current_title = ""
+        self.current_thumbnail = None
+        self.current_duration = None
+        self.current_archive_id = None
+        self.thumbnail.set_paintable(None)
+        self.set_thumb_loading(False)
+        self.progress.set_fraction(0.0)
+        self.status_label.set_text("Idle")
+        self.download_button.set_sensitive(False)
+        self.presets_row.set_sensitive(False)
+        self.format_table = FormatTable([])
+        self.formats = []
+        self.dropdown_format_ids = []
+        self.preset_options = []
+        old_dropdown = self.format_dropdown
+        parent = old_dropdown.get_parent()
+        if parent:
+            parent.remove(old_dropdown)
+        self.format_dropdown = Gtk.DropDown.new_from_strings(["No formats loaded"])
+        self.title_label.get_parent().insert_child_after(self.format_dropdown, self.presets_row)
+        old_preset = self.presets_dropdown
+        parent = old_preset.get_parent()
+        if parent:
+            parent.remove(old_preset)
+        self.presets_dropdown = Gtk.DropDown.new_from_strings(["Selected format"])
+        self.presets_label.get_parent().insert_child_after(self.presets_dropdown, self.presets_label)
+
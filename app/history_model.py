@@ -0,0 +1,65 @@
+from gi.repository import Gio, GObject
+
+
+PAGE_SIZE = 200
+
+
+class HistoryEntry(GObject.Object):
+    # Plain record for one history row; the list view binds its widgets to these fields.
+
+    def __init__(self, record):
+        super().__init__()
+        self.record = record
+
+
+class HistoryModel(GObject.Object, Gio.ListModel):
+    # Gio.ListModel over HistoryStore. Only the pages the list view asks for
+    # are read from SQLite, so the model stays cheap with a very long history.
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.query = ""
+        self._pages = {}
+        self._count = store.count()
+
+    def do_get_item_type(self):
+        return HistoryEntry
+
+    def do_get_n_items(self):
+        return self._count
+
+    def do_get_item(self, position):
+        if position >= self._count:
+            return None
+        page_index, offset = divmod(position, PAGE_SIZE)
+        page = self._pages.get(page_index)
+        if page is None:
+            records = self.store.page(page_index * PAGE_SIZE, PAGE_SIZE, self.query)
+            page = [HistoryEntry(record) for record in records]
+            self._pages[page_index] = page
+        if offset >= len(page):
+            return None
+        return page[offset]
+
+    def reload(self):
+        old_count = self._count
+        self._pages = {}
+        self._count = self.store.count(self.query)
+        self.items_changed(0, old_count, self._count)
+
+    def set_query(self, query):
+        query = query.strip()
+        if query == self.query:
+            return
+        self.query = query
+        self.reload()
+
+    def prepend(self):
+        # A new download sorts first; without a search only position 0 changes.
+        if self.query:
+            self.reload()
+            return
+        self._pages = {}
+        self._count += 1
+        self.items_changed(0, 0, 1)
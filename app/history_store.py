@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL,
+        title TEXT,
+        format_label TEXT,
+        path TEXT,
+        thumbnail TEXT,
+        size INTEGER,
+        duration REAL,
+        started REAL,
+        finished REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS history_url ON history (url)",
+    "CREATE INDEX IF NOT EXISTS history_finished ON history (finished)",
+)
+FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+        title, url, content='history', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN
+        INSERT INTO history_fts (rowid, title, url) VALUES (new.id, new.title, new.url);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN
+        INSERT INTO history_fts (history_fts, rowid, title, url)
+        VALUES ('delete', old.id, old.title, old.url);
+    END
+    """,
+)
+COLUMNS = ("id", "url", "title", "format_label", "path", "thumbnail", "size", "duration", "started", "finished")
+
+
+class HistoryStore:
+    # Finished downloads, newest first. Title/URL search uses FTS5 when the
+    # SQLite build has it and falls back to LIKE otherwise.
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        try:
+            for statement in FTS_SCHEMA:
+                self._conn.execute(statement)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+
+    def add(self, url, title, format_label, path, thumbnail=None, size=None, duration=None,
+            started=None):
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO history (url, title, format_label, path, thumbnail, size, duration, "
+                "started, finished) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, title, format_label, path, thumbnail, size, duration, started, time.time())
+            )
+            return cursor.lastrowid
+
+    def _where(self, query):
+        terms = (query or "").split()
+        if not terms:
+            return "", []
+        if self.has_fts:
+            # Every word must match, each as a prefix, quoted so FTS syntax in titles is inert.
+            match = " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+            return "WHERE id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)", [match]
+        clauses = []
+        params = []
+        for term in terms:
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append("(title LIKE ? ESCAPE '\\' OR url LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+        return "WHERE " + " AND ".join(clauses), params
+
+    def count(self, query=None):
+        where, params = self._where(query)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM history {where}", params).fetchone()[0]
+
+    def page(self, offset, limit, query=None):
+        where, params = self._where(query)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM history {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM history")
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,35 @@
+import os
+import sys
+import threading
+from collections import Counter
+
+
+_lock = threading.Lock()
+counters = Counter()
+timings = {}
+
+
+def incr(name, amount=1):
+    with _lock:
+        counters[name] += amount
+        value = counters[name]
+    if os.environ.get("GLASSDROP_DEBUG"):
+        print(f"[glassdrop] {name} = {value}", file=sys.stderr)
+
+
+def record_time(name, seconds):
+    with _lock:
+        entry = timings.setdefault(name, {"count": 0, "total": 0.0, "last": 0.0})
+        entry["count"] += 1
+        entry["total"] += seconds
+        entry["last"] = seconds
+    if os.environ.get("GLASSDROP_DEBUG"):
+        print(f"[glassdrop] {name}: {seconds * 1000:.1f} ms", file=sys.stderr)
+
+
+def snapshot():
+    with _lock:
+        return {
+            "counters": dict(counters),
+            "timings": {name: dict(entry) for name, entry in timings.items()},
+        }
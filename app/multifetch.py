@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from scheduler import DownloadScheduler
+
+
+URL_PREFIXES = ("http://", "https://")
+
+
+def split_urls(text):
+    # Pasted or dropped text can hold many links, one per line or separated by spaces;
+    # text/uri-list comment lines are skipped and repeats dropped, keeping the order.
+    urls = []
+    seen = set()
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if line.startswith("#"):
+            continue
+        for word in line.split():
+            word = word.strip("<>\"'")
+            if word.startswith(URL_PREFIXES) and word not in seen:
+                seen.add(word)
+                urls.append(word)
+    return urls
+
+
+def fetch_all(urls, fetch, cancel=None, workers=4, per_host=2):
+    # Calls fetch(url) for every URL on a bounded pool; the download scheduler's host
+    # slots keep any one site at per_host requests at a time. fetch reports its own
+    # results and errors. Returns once all started calls are done.
+    scheduler = DownloadScheduler(workers, per_host)
+    queue = [{"url": url} for url in urls]
+    cond = threading.Condition()
+
+    def run(item):
+        try:
+            fetch(item["url"])
+        finally:
+            with cond:
+                scheduler.finish(item)
+                cond.notify()
+
+    with ThreadPoolExecutor(max_workers=scheduler.max_active, thread_name_prefix="metadata") as pool:
+        with cond:
+            while queue or scheduler.active:
+                if cancel is not None and cancel.is_set():
+                    break
+                index = scheduler.pick(queue) if queue else None
+                if index is None:
+                    # The timeout lets a cancel through while every slot is busy.
+                    cond.wait(0.2)
+                    continue
+                item = queue.pop(index)
+                scheduler.start(item)
+                pool.submit(run, item)
@@ -0,0 +1,24 @@
+from urllib.parse import parse_qs, urlsplit
+
+
+CHANNEL_PREFIXES = ("/@", "/channel/", "/c/", "/user/")
+CHANNEL_TABS = ("", "videos", "shorts", "streams", "playlists", "featured")
+COLLECTION_SEGMENTS = ("playlist", "playlists", "sets", "album", "albums", "collection", "series")
+
+
+def looks_like_playlist(url):
+    # Cheap URL-shape check deciding whether to stream entries instead of running -J.
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    path = parts.path.rstrip("/")
+    query = parse_qs(parts.query)
+    if "list" in query and "v" not in query:
+        return True
+    if "youtube.com" in host and path.startswith(CHANNEL_PREFIXES):
+        segments = path.split("/")
+        # "/@name/videos" vs "/channel/<id>/videos": the tab follows the channel name.
+        depth = 2 if path.startswith("/@") else 3
+        tail = segments[depth] if len(segments) > depth else ""
+        return tail in CHANNEL_TABS
+    segments = [segment.lower() for segment in path.split("/") if segment]
+    return any(segment in COLLECTION_SEGMENTS for segment in segments)
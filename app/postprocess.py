@@ -0,0 +1,116 @@
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+
+AUDIO_CODECS = {
+    # Roughly yt-dlp's default --audio-quality 5 for each encoder.
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "5"],
+    "m4a": ["-c:a", "aac", "-q:a", "2"],
+}
+# Sources that already hold AAC and only need remuxing into .m4a.
+AAC_SOURCES = (".m4a", ".mp4", ".aac")
+
+
+def ffmpeg_cmd():
+    # Same host/sandbox split as yt_dlp_base_cmd.
+    if os.environ.get("FLATPAK_ID"):
+        return ["flatpak-spawn", "--host", "ffmpeg"]
+    return ["ffmpeg"]
+
+
+def ffmpeg_available():
+    return bool(os.environ.get("FLATPAK_ID")) or shutil.which("ffmpeg") is not None
+
+
+def audio_job(post_args):
+    # The --extract-audio presets become a job for the CPU pool; anything else stays with yt-dlp.
+    post_args = post_args or []
+    if "--extract-audio" not in post_args or "--audio-format" not in post_args:
+        return None
+    index = post_args.index("--audio-format") + 1
+    audio_format = post_args[index] if index < len(post_args) else None
+    if audio_format not in AUDIO_CODECS:
+        return None
+    return {"audio_format": audio_format}
+
+
+def strip_audio_args(post_args):
+    args = []
+    skip = False
+    for arg in post_args or []:
+        if skip:
+            skip = False
+            continue
+        if arg == "--extract-audio":
+            continue
+        if arg == "--audio-format":
+            skip = True
+            continue
+        args.append(arg)
+    return args
+
+
+def build_audio_cmd(source, dest, audio_format):
+    cmd = ffmpeg_cmd() + ["-y", "-nostdin", "-loglevel", "error", "-i", source, "-vn"]
+    if audio_format == "m4a" and source.lower().endswith(AAC_SOURCES):
+        cmd += ["-c:a", "copy"]
+    else:
+        cmd += AUDIO_CODECS[audio_format]
+    return cmd + [dest]
+
+
+def run_audio_job(item, source, job):
+    # Returns (returncode, dest_path, error_tail), like downloader.run_download.
+    audio_format = job["audio_format"]
+    dest = os.path.splitext(source)[0] + "." + audio_format
+    if os.path.normcase(dest) == os.path.normcase(source):
+        return 0, source, []
+    tmp_dest = os.path.splitext(source)[0] + ".temp." + audio_format
+    process = subprocess.Popen(
+        build_audio_cmd(source, tmp_dest, audio_format),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    item["process"] = process
+    _out, err = process.communicate()
+    item["process"] = None
+    if process.returncode != 0:
+        try:
+            os.remove(tmp_dest)
+        except OSError:
+            pass
+        error_tail = [line for line in err.splitlines() if line.strip()][-20:]
+        return process.returncode, None, error_tail or ["Audio conversion failed."]
+    os.replace(tmp_dest, dest)
+    # yt-dlp deletes the downloaded stream after --extract-audio unless -k is given.
+    try:
+        os.remove(source)
+    except OSError:
+        pass
+    return 0, dest, []
+
+
+class PostProcessPool:
+    # CPU-bound jobs run here so their download slot is free for the next item meanwhile.
+
+    def __init__(self, workers=None):
+        self.workers = max(1, int(workers or os.cpu_count() or 2))
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="postprocess")
+
+    def submit(self, item, source, job, on_start, on_done):
+        # on_start() and on_done(returncode, dest_path, error_tail) run on a pool thread.
+        return self.executor.submit(self._run, item, source, job, on_start, on_done)
+
+    def _run(self, item, source, job, on_start, on_done):
+        if item.get("paused"):
+            on_done(1, None, [])
+            return
+        on_start()
+        try:
+            result = run_audio_job(item, source, job)
+        except OSError as e:
+            result = (1, None, [str(e)])
+        on_done(*result)
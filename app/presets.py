@@ -0,0 +1,32 @@
+PRESETS = [
+    {"label": "Selected format", "kind": "selected"},
+    # Highest quality expected to finish within the auto_quality_* budgets in settings.json.
+    {"label": "Auto (fits budget)", "kind": "auto"},
+    {"label": "Best (auto)", "kind": "selector", "format": "best"},
+    {"label": "Worst (auto)", "kind": "selector", "format": "worst"},
+    {"label": "Best Video + Audio", "kind": "selector",
+     "format": "bestvideo+bestaudio/best"},
+    {"label": "Audio Only (best)", "kind": "selector", "format": "bestaudio"},
+    {"label": "Audio Only (worst)", "kind": "selector", "format": "worstaudio"},
+    {"label": "MP3 (audio)", "kind": "audio_format", "format": "bestaudio",
+     "post": ["--extract-audio", "--audio-format", "mp3"]},
+    {"label": "M4A (audio)", "kind": "audio_format", "format": "bestaudio",
+     "post": ["--extract-audio", "--audio-format", "m4a"]},
+    {"label": "720p", "kind": "selector",
+     "format": "bestvideo[height<=720]+bestaudio/best[height<=720]"},
+    {"label": "1080p", "kind": "selector",
+     "format": "bestvideo[height<=1080]+bestaudio/best[height<=1080]"},
+    {"label": "4K", "kind": "selector",
+     "format": "bestvideo[height<=2160]+bestaudio/best[height<=2160]"},
+]
+
+# Presets that do not depend on one video's format list, usable for many URLs at once.
+BULK_PRESETS = [p for p in PRESETS if p["kind"] in ("selector", "audio_format")]
+
+
+def find_preset(label, presets=PRESETS):
+    wanted = label.strip().lower()
+    for preset in presets:
+        if preset["label"].lower() == wanted:
+            return preset
+    return None
@@ -0,0 +1,105 @@
+PROGRESS_PREFIX = "[glassdrop-progress] "
+FILE_PREFIX = "[glassdrop-file] "
+PROGRESS_FIELDS = (
+    "status", "downloaded_bytes", "total_bytes", "total_bytes_estimate",
+    "speed", "eta", "fragment_index", "fragment_count",
+)
+# Space-separated fixed fields ("NA" when unknown) are cheaper to split than JSON is to decode.
+PROGRESS_TEMPLATE = "download:" + PROGRESS_PREFIX + " ".join(
+    f"%(progress.{field})s" for field in PROGRESS_FIELDS
+)
+FILE_TEMPLATE = "after_move:" + FILE_PREFIX + "%(filepath)s"
+
+
+def progress_args():
+    # --print implies --quiet, so the only stdout lines left are our two
+    # templates plus warnings/errors, which become the error tail.
+    return [
+        "--newline",
+        "--progress",
+        "--progress-template", PROGRESS_TEMPLATE,
+        "--print", FILE_TEMPLATE,
+    ]
+
+
+class ProgressEvent:
+    __slots__ = (
+        "status", "downloaded", "total", "speed", "eta",
+        "fragment_index", "fragment_count",
+    )
+
+    def __init__(self, status, downloaded, total, speed, eta, fragment_index, fragment_count):
+        self.status = status
+        self.downloaded = downloaded
+        self.total = total
+        self.speed = speed
+        self.eta = eta
+        self.fragment_index = fragment_index
+        self.fragment_count = fragment_count
+
+    @property
+    def fraction(self):
+        if self.total:
+            return min(1.0, self.downloaded / self.total)
+        if self.fragment_count and self.fragment_index:
+            return min(1.0, self.fragment_index / self.fragment_count)
+        return None
+
+    def summary(self):
+        parts = []
+        fraction = self.fraction
+        if fraction is not None:
+            parts.append(f"{fraction * 100:.1f}%")
+        if self.speed:
+            parts.append(f"{format_bytes(self.speed)}/s")
+        return parts
+
+
+def _number(value):
+    if value == "NA":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_progress(line):
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    fields = line[len(PROGRESS_PREFIX):].split()
+    if len(fields) != len(PROGRESS_FIELDS):
+        return None
+    status, downloaded, total, estimate, speed, eta, fragment_index, fragment_count = fields
+    return ProgressEvent(
+        status,
+        _number(downloaded) or 0,
+        _number(total) or _number(estimate),
+        _number(speed),
+        _number(eta),
+        _number(fragment_index),
+        _number(fragment_count),
+    )
+
+
+def parse_filepath(line):
+    if not line.startswith(FILE_PREFIX):
+        return None
+    return line[len(FILE_PREFIX):].strip() or None
+
+
+def format_bytes(value):
+    value = float(value)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024 or unit == "GiB":
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.2f}{unit}"
+        value /= 1024
+
+
+def format_eta(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
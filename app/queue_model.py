@@ -0,0 +1,22 @@
+from gi.repository import GObject
+
+
+class QueueRow(GObject.Object):
+    # What the queue view shows for one item. Workers change these properties
+    # (through the UI dispatcher) and the bound row widgets follow the notifications.
+
+    title = GObject.Property(type=str, default="")
+    format_label = GObject.Property(type=str, default="")
+    thumbnail = GObject.Property(type=str, default="")
+    status = GObject.Property(type=str, default="Queued")
+    fraction = GObject.Property(type=float, default=0.0)
+    # Stopped by the user this session; the row shows a resume button while set.
+    paused = GObject.Property(type=bool, default=False)
+
+    def __init__(self, title, format_label, thumbnail=None, status="Queued"):
+        super().__init__(
+            title=title,
+            format_label=format_label,
+            thumbnail=thumbnail or "",
+            status=status,
+        )
@@ -0,0 +1,148 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    format_id TEXT,
+    format_selector TEXT,
+    format_label TEXT,
+    title TEXT,
+    thumbnail TEXT,
+    post_args TEXT,
+    directory TEXT,
+    status TEXT NOT NULL,
+    created REAL NOT NULL,
+    archive_id TEXT
+)
+"""
+RESUMABLE = ("queued", "downloading", "paused")
+
+
+class QueueStore:
+    # SQLite journal of the download queue. Writes are buffered and committed
+    # together after flush_interval seconds, so bulk enqueues cost one fsync.
+
+    def __init__(self, path, flush_interval=0.5):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+        self._closed = False
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(queue)")]
+        if "archive_id" not in columns:
+            # Journals from before archive ids were kept.
+            self._conn.execute("ALTER TABLE queue ADD COLUMN archive_id TEXT")
+        row = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM queue").fetchone()
+        self._next_id = row[0] + 1
+
+    def add(self, item, status="queued"):
+        with self._lock:
+            item_id = self._next_id
+            self._next_id += 1
+            self._pending.append((
+                "INSERT INTO queue (id, url, format_id, format_selector, format_label, title, "
+                "thumbnail, post_args, directory, status, created, archive_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    item_id,
+                    item["url"],
+                    item.get("format_id"),
+                    item.get("format_selector"),
+                    item.get("format_label"),
+                    item.get("title"),
+                    item.get("thumbnail"),
+                    json.dumps(item.get("post_args") or []),
+                    item.get("directory"),
+                    status,
+                    time.time(),
+                    item.get("archive_id"),
+                ),
+            ))
+            self._schedule()
+        return item_id
+
+    def set_status(self, item_id, status):
+        self._queue_write("UPDATE queue SET status = ? WHERE id = ?", (status, item_id))
+
+    def remove(self, item_id):
+        self._queue_write("DELETE FROM queue WHERE id = ?", (item_id,))
+
+    def _queue_write(self, sql, params):
+        with self._lock:
+            if self._closed:
+                return
+            self._pending.append((sql, params))
+            self._schedule()
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+            self._timer = None
+            if not pending or self._closed:
+                return
+            try:
+                self._conn.execute("BEGIN")
+                for sql, params in pending:
+                    self._conn.execute(sql, params)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+
+    def resumable_items(self):
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, url, format_id, format_selector, format_label, title, thumbnail, "
+                "post_args, directory, status, archive_id FROM queue WHERE status IN (?, ?, ?) ORDER BY id",
+                RESUMABLE
+            ).fetchall()
+        items = []
+        for row in rows:
+            item_id, url, format_id, format_selector, format_label, title, thumbnail, post_args, \
+                directory, status, entry_id = row
+            try:
+                post_args = json.loads(post_args or "[]") or None
+            except ValueError:
+                post_args = None
+            items.append({
+                "store_id": item_id,
+                "url": url,
+                "format_id": format_id,
+                "format_selector": format_selector,
+                "format_label": format_label,
+                "title": title,
+                "thumbnail": thumbnail,
+                "post_args": post_args,
+                "directory": directory,
+                "archive_id": entry_id,
+                "interrupted": status != "queued",
+            })
+        return items
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._conn.close()
@@ -0,0 +1,72 @@
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+def host_of(url):
+    host = (urlsplit(url).hostname or "").lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+class DownloadScheduler:
+    # Decides which queued items may start; the caller owns the queue and the worker threads.
+
+    def __init__(self, max_active=3, max_per_host=2):
+        self.max_active = max(1, int(max_active))
+        self.max_per_host = max(1, int(max_per_host))
+        self.active = []
+        self.per_host = Counter()
+        self.cooldown_until = {}
+
+    def has_free_slot(self):
+        return len(self.active) < self.max_active
+
+    def host_has_slot(self, host):
+        until = self.cooldown_until.get(host)
+        if until is not None:
+            if time.monotonic() < until:
+                return False
+            del self.cooldown_until[host]
+        return self.per_host[host] < self.max_per_host
+
+    def cooldown(self, host, seconds):
+        # A throttling site gets no new downloads until the cooldown ends.
+        until = time.monotonic() + seconds
+        self.cooldown_until[host] = max(until, self.cooldown_until.get(host, 0))
+
+    def pick(self, queue):
+        if not self.has_free_slot():
+            return None
+        now = time.monotonic()
+        for index, item in enumerate(queue):
+            if item.get("not_before", 0) > now:
+                continue
+            if self.host_has_slot(host_of(item["url"])):
+                return index
+        return None
+
+    def next_ready_in(self, queue):
+        # Seconds until a queued item's backoff or host cooldown ends; None if nothing is waiting.
+        now = time.monotonic()
+        ready = [
+            max(item.get("not_before", 0), self.cooldown_until.get(host_of(item["url"]), 0))
+            for item in queue
+        ]
+        waits = [at - now for at in ready if at > now]
+        return min(waits) if waits else None
+
+    def start(self, item):
+        item["host"] = host_of(item["url"])
+        self.active.append(item)
+        self.per_host[item["host"]] += 1
+
+    def finish(self, item):
+        if item not in self.active:
+            return
+        self.active.remove(item)
+        self.per_host[item["host"]] -= 1
+        if self.per_host[item["host"]] <= 0:
+            del self.per_host[item["host"]]
@@ -0,0 +1,252 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+from engine import FetchCancelled, FetchError
+from progress import ProgressEvent
+
+
+CHUNK_SIZE = 256 * 1024
+# Files smaller than this per connection are not worth splitting.
+MIN_SEGMENT = 2 * 1024 * 1024
+
+
+class SegmentedTask:
+    # Stands in for the yt-dlp Popen in item["process"], so stopping a download works the same way.
+
+    def __init__(self):
+        self.cancel = threading.Event()
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.cancel.set()
+
+
+def _request(url, headers, start=None, end=None):
+    request = urllib.request.Request(url, headers=dict(headers or {}))
+    if start is not None:
+        request.add_header("Range", f"bytes={start}-{'' if end is None else end}")
+    return request
+
+
+def probe(url, headers=None, timeout=15):
+    # One-byte range request: (total size, whether the server honours ranges).
+    try:
+        with urllib.request.urlopen(_request(url, headers, 0, 0), timeout=timeout) as resp:
+            content_range = resp.headers.get("Content-Range") or ""
+            if resp.status == 206 and "/" in content_range:
+                total = content_range.rsplit("/", 1)[1]
+                if total.isdigit():
+                    return int(total), True
+            length = resp.headers.get("Content-Length")
+            return (int(length) if length and length.isdigit() else None), False
+    except (OSError, ValueError) as e:
+        raise FetchError(str(e))
+
+
+def split_ranges(total, connections):
+    connections = max(1, min(connections, total // MIN_SEGMENT or 1))
+    size = total // connections
+    ranges = []
+    for index in range(connections):
+        start = index * size
+        end = total - 1 if index == connections - 1 else start + size - 1
+        ranges.append((start, end))
+    return ranges
+
+
+class _Transfer:
+    # Byte counter shared by all segments, used for progress and the speed limit (a
+    # bandwidth.RateLimiter, whose rate may change mid-download). `done` maps
+    # each range start to the bytes already on disk for it and is saved next to the .part
+    # file, so a stopped download continues each range where it left off.
+
+    def __init__(self, total, limiter, on_progress, cancel, state_path=None, ranges=None):
+        self.total = total
+        self.limiter = limiter
+        self.on_progress = on_progress
+        self.cancel = cancel
+        self.state_path = state_path
+        self.ranges = ranges or []
+        self.done = {start: done for start, _end, done in self.ranges}
+        self.downloaded = self.resumed = sum(self.done.values())
+        self.started = time.monotonic()
+        self.last_report = 0.0
+        self.last_save = self.started
+        self.lock = threading.Lock()
+
+    def add(self, count, start=None):
+        with self.lock:
+            self.downloaded += count
+            if start is not None:
+                self.done[start] += count
+            downloaded = self.downloaded
+            now = time.monotonic()
+            elapsed = max(now - self.started, 1e-6)
+            report = now - self.last_report >= 0.1 or downloaded == self.total
+            if report:
+                self.last_report = now
+            if self.state_path and now - self.last_save >= 1.0:
+                self.last_save = now
+                self._save()
+        fresh = downloaded - self.resumed
+        if report and self.on_progress is not None:
+            speed = fresh / elapsed
+            eta = (self.total - downloaded) / speed if self.total and speed else None
+            self.on_progress(ProgressEvent("downloading", downloaded, self.total, speed, eta, None, None))
+        if self.limiter is not None:
+            self.limiter.consume(count, self.cancel)
+
+    def _save(self):
+        state = {
+            "total": self.total,
+            "ranges": [[start, end, self.done[start]] for start, end, _done in self.ranges],
+        }
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.state_path) or ".", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError:
+            if tmp_path is not None:
+                _remove(tmp_path)
+
+    def save(self):
+        if self.state_path:
+            with self.lock:
+                self._save()
+
+    def read_into(self, resp, f, start=None):
+        # Returns the bytes written. A connection that closes early just ends the stream,
+        # so callers compare the count with what they asked for.
+        written = 0
+        while True:
+            if self.cancel.is_set():
+                raise FetchCancelled("Download cancelled")
+            chunk = resp.read(CHUNK_SIZE)
+            if not chunk:
+                return written
+            f.write(chunk)
+            # Flushed before it is counted, so the saved progress never runs ahead of the file.
+            f.flush()
+            written += len(chunk)
+            self.add(len(chunk), start)
+
+
+def _check_length(received, expected):
+    if received != expected:
+        raise FetchError(f"Connection closed early: got {received} of {expected} bytes")
+
+
+def _fetch_segment(url, headers, path, start, end, transfer, timeout):
+    offset = start + transfer.done[start]
+    if offset > end:
+        return
+    with urllib.request.urlopen(_request(url, headers, offset, end), timeout=timeout) as resp:
+        if resp.status != 206:
+            raise FetchError(f"Server ignored range request ({resp.status})")
+        with open(path, "r+b") as f:
+            f.seek(offset)
+            transfer.read_into(resp, f, start)
+    _check_length(transfer.done[start], end - start + 1)
+
+
+def _load_ranges(state_path, part_path, total):
+    # Ranges saved by an earlier run on the same file, or None to start afresh.
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state["total"] != total or os.path.getsize(part_path) != total:
+            return None
+        ranges = [(int(start), int(end), int(done)) for start, end, done in state["ranges"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not ranges or any(done < 0 or start + done > end + 1 for start, end, done in ranges):
+        return None
+    return ranges
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _download_ranges(url, headers, part_path, transfer, timeout):
+    with ThreadPoolExecutor(max_workers=len(transfer.ranges), thread_name_prefix="segment") as pool:
+        futures = [
+            pool.submit(_fetch_segment, url, headers, part_path, start, end, transfer, timeout)
+            for start, end, _done in transfer.ranges
+        ]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        errors = [future.exception() for future in done if future.exception()]
+        if errors:
+            # One failed segment stops the others; report the failure rather than the cancellations.
+            transfer.cancel.set()
+            wait(pending)
+            errors.sort(key=lambda error: isinstance(error, FetchCancelled))
+            raise errors[0]
+
+
+def _download_stream(url, headers, part_path, total, ranged, transfer, timeout):
+    # One plain stream, continuing a partial .part file when the server honours ranges.
+    offset = 0
+    if ranged and total and os.path.exists(part_path):
+        offset = os.path.getsize(part_path)
+        if offset >= total:
+            offset = 0
+    request = _request(url, headers, offset) if offset else _request(url, headers)
+    with urllib.request.urlopen(request, timeout=timeout) as resp:
+        if offset and resp.status != 206:
+            offset = 0
+        transfer.downloaded = transfer.resumed = offset
+        with open(part_path, "ab" if offset else "wb") as f:
+            received = transfer.read_into(resp, f)
+        length = resp.headers.get("Content-Length")
+        if length and length.isdigit():
+            _check_length(received, int(length))
+    if total:
+        _check_length(os.path.getsize(part_path), total)
+
+
+def download(url, dest, connections=4, headers=None, limiter=None, on_progress=None, cancel=None,
+             timeout=30):
+    # Downloads url to dest over up to `connections` parallel range requests.
+    # Servers without range support get one plain stream.
+    cancel = cancel or threading.Event()
+    part_path = dest + ".part"
+    state_path = part_path + ".ranges"
+    total, ranged = probe(url, headers, timeout)
+    try:
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        ranges = _load_ranges(state_path, part_path, total) if ranged and total else None
+        if ranges is None and ranged and total and connections > 1 and total >= 2 * MIN_SEGMENT:
+            with open(part_path, "wb") as f:
+                f.truncate(total)
+            ranges = [(start, end, 0) for start, end in split_ranges(total, connections)]
+        if ranges is not None:
+            transfer = _Transfer(total, limiter, on_progress, cancel, state_path, ranges)
+            transfer.save()
+            try:
+                _download_ranges(url, headers, part_path, transfer, timeout)
+            finally:
+                transfer.save()
+        else:
+            transfer = _Transfer(total, limiter, on_progress, cancel)
+            _download_stream(url, headers, part_path, total, ranged, transfer, timeout)
+    except FetchError:
+        raise
+    except (OSError, ValueError) as e:
+        raise FetchError(str(e))
+    os.replace(part_path, dest)
+    _remove(state_path)
+    return transfer.downloaded
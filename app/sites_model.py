@@ -0,0 +1,9 @@
+from gi.repository import GObject
+
+
+class SiteEntry(GObject.Object):
+    # One row of the supported sites list; site is a dict from supported_sites.
+
+    def __init__(self, site):
+        super().__init__()
+        self.site = site
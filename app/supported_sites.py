@@ -0,0 +1,132 @@
+import json
+import os
+import re
+import tempfile
+
+import config
+
+
+MARKDOWN_URL = "https://raw.githubusercontent.com/yt-dlp/yt-dlp/refs/heads/master/supportedsites.md"
+# " - **name**: description" in yt-dlp's supportedsites.md.
+SITE_LINE = re.compile(r"^\s*[-*]\s+\*\*(.+?)\*\*:?\s*(.*)$")
+NETRC_NOTE = re.compile(r"\[\*[^*]*\*\]\(##[^)]*\)")
+BROKEN_NOTE = "(**Currently broken**)"
+
+
+def _site(name, description, domains, working):
+    site = {
+        "name": name,
+        "description": description,
+        "domain": domains[0] if domains else "",
+        "working": working,
+    }
+    # Lowercased once, so type-ahead filtering is plain substring tests.
+    site["search"] = " ".join([name, description] + list(domains)).lower()
+    return site
+
+
+def _domains(name, domains):
+    # The domain shown for a site comes first: the shortest one containing the extractor's
+    # name (youtube.com rather than a mirror), else the shortest.
+    base = re.sub(r"[^a-z0-9]", "", name.split(":", 1)[0].lower())
+    domains = {domain[4:] if domain.startswith("www.") else domain for domain in domains}
+    return sorted(domains, key=lambda domain: (base not in domain.replace("-", ""), len(domain), domain))
+
+
+def sites_from_index(index):
+    sites = []
+    for extractor in index.extractors:
+        if not extractor.get("listed", True):
+            continue
+        sites.append(_site(
+            extractor["name"],
+            extractor.get("description") or "",
+            _domains(extractor["name"], extractor["domains"]),
+            extractor["working"],
+        ))
+    return sites
+
+
+def parse_markdown(text):
+    sites = []
+    for line in text.splitlines():
+        match = SITE_LINE.match(line)
+        if not match:
+            continue
+        name, rest = match.groups()
+        working = BROKEN_NOTE not in rest
+        rest = NETRC_NOTE.sub("", rest.replace(BROKEN_NOTE, "")).replace("**", "").strip()
+        host = name.split(":", 1)[0]
+        sites.append(_site(name, rest, [host.lower()] if "." in host else [], working))
+    return sites
+
+
+def fetch_markdown(directory=None, timeout=10):
+    # supportedsites.md, revalidated with ETag / If-Modified-Since on every call: an
+    # unchanged list costs a 304, and the cached copy is used when offline.
+    import urllib.request
+
+    directory = directory or config.cache_dir()
+    text_path = os.path.join(directory, "supportedsites.md")
+    meta_path = os.path.join(directory, "supportedsites.json")
+    try:
+        with open(text_path, "r", encoding="utf-8") as f:
+            cached = f.read()
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        cached = None
+        meta = {}
+
+    request = urllib.request.Request(MARKDOWN_URL)
+    if cached is not None:
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as resp:
+            text = resp.read().decode("utf-8", errors="replace")
+            meta = {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }
+    except (OSError, ValueError):
+        # HTTPError covers 304 Not Modified as well as real failures; either way the copy stands.
+        return cached
+
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # A temp name per writer: the list can be refreshed from two dialogs or processes at once.
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, text_path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+    except OSError:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return text
+
+
+def load_sites(index=None):
+    # From the local extractor index when there is one (offline, matches the installed
+    # yt-dlp), otherwise from the published list. None when neither is available.
+    if index is not None:
+        sites = sites_from_index(index)
+    else:
+        text = fetch_markdown()
+        if text is None:
+            return None
+        sites = parse_markdown(text)
+    sites.sort(key=lambda site: site["name"].lower())
+    return sites
+
+
+def matches(site, terms):
+    return all(term in site["search"] for term in terms)
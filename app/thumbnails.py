@@ -0,0 +1,132 @@
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+gi.require_version("GdkPixbuf", "2.0")
+
+from gi.repository import Gdk, GdkPixbuf, GLib
+
+from engine import FetchCancelled, FetchError, fetch_bytes
+
+
+class ThumbnailCache:
+    # Image bytes stored under a hash of their URL, capped in size with LRU eviction.
+
+    def __init__(self, directory, max_bytes=100 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, url):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.img")
+
+    def read(self, url):
+        path = self.path_for(url)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def write(self, url, data):
+        path = self.path_for(url)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # One temp file per writer: two loaders can fetch the same thumbnail at once.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for root, _dirs, names in os.walk(self.directory):
+                for name in names:
+                    if not name.endswith(".img"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+                    total += st.st_size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _mtime, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+
+
+def decode_texture(data, width, height):
+    # Decoding at the target size keeps full-resolution pixels off the main thread and out of memory.
+    loader = GdkPixbuf.PixbufLoader()
+
+    def on_size_prepared(pixbuf_loader, src_width, src_height):
+        if src_width <= 0 or src_height <= 0:
+            return
+        scale = min(width / src_width, height / src_height, 1.0)
+        pixbuf_loader.set_size(max(1, int(src_width * scale)), max(1, int(src_height * scale)))
+
+    loader.connect("size-prepared", on_size_prepared)
+    try:
+        loader.write(data)
+        loader.close()
+    except GLib.Error:
+        return None
+    pixbuf = loader.get_pixbuf()
+    if pixbuf is None:
+        return None
+    return Gdk.Texture.new_for_pixbuf(pixbuf)
+
+
+class ThumbnailLoader:
+
+    def __init__(self, cache, workers=4):
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumb")
+
+    def load(self, url, width, height, callback, cancel=None, cache_only=False):
+        # callback(texture_or_None) runs on the worker thread; route it through the UI dispatcher.
+        return self.executor.submit(self._load, url, width, height, callback, cancel, cache_only)
+
+    def _load(self, url, width, height, callback, cancel, cache_only):
+        data = self.cache.read(url)
+        if data is None:
+            if cache_only:
+                callback(None)
+                return
+            try:
+                data = fetch_bytes(url, cancel)
+            except FetchCancelled:
+                return
+            except FetchError:
+                callback(None)
+                return
+            self.cache.write(url, data)
+        if cancel is not None and cancel.is_set():
+            return
+        callback(decode_texture(data, width, height))
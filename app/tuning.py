@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+THROTTLE_MARKERS = ("HTTP Error 429", "Too Many Requests", "Retrying fragment")
+# A count that got a host to throttle us is avoided for this long.
+CEILING_TTL = 24 * 3600
+
+
+def is_throttle_line(line):
+    return any(marker in line for marker in THROTTLE_MARKERS)
+
+
+def tuning_key(item):
+    # One site can serve different extractors' media from different CDNs, so counts are
+    # kept per extractor and host ("youtube:youtube.com"); items without one use the host.
+    extractor = (item.get("archive_id") or "").partition(" ")[0]
+    return f"{extractor}:{item['host']}" if extractor else item["host"]
+
+
+class FragmentTuner:
+    # Fragment concurrency (-N) per tuning_key(), adjusted between downloads: double while
+    # throughput keeps improving, fall back to the best known count when it stops, halve on
+    # 429s or fragment retries. A running yt-dlp keeps its -N, so each download is one sample.
+
+    def __init__(self, path, start=2, maximum=16):
+        self.path = path
+        self.start = start
+        self.maximum = maximum
+        self._lock = threading.Lock()
+        self._table = None
+
+    def _load(self):
+        if self._table is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._table = json.load(f)
+            except (OSError, ValueError):
+                self._table = {}
+        return self._table
+
+    def _save(self):
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # A temp name per writer: the GUI and a --batch run can share the file.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._table, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def suggest(self, key):
+        with self._lock:
+            entry = self._load().get(key)
+            return entry["next"] if entry else self.start
+
+    def record(self, key, connections, stats):
+        # stats comes from downloader.run_download; very short downloads say little. Speeds
+        # only count for fragmented downloads (-N does nothing for one file) that ran without
+        # a speed limit: a capped speed would read as "more connections did not help".
+        if not key or not stats:
+            return
+        throttled = stats["throttled"] > 0
+        speed = stats["speed_sum"] / stats["speed_samples"] if stats["speed_samples"] else 0
+        seconds = time.monotonic() - stats["started"]
+        if not throttled and (not speed or seconds < 3 or not stats["fragmented"] or stats["limited"]):
+            return
+        with self._lock:
+            table = self._load()
+            entry = table.setdefault(key, {"next": self.start, "best": self.start, "best_speed": 0})
+            now = int(time.time())
+            if entry.get("ceiling") and now - entry.get("ceiling_at", 0) > CEILING_TTL:
+                del entry["ceiling"]
+            if throttled:
+                entry["ceiling"] = connections
+                entry["ceiling_at"] = now
+                entry["next"] = max(1, connections // 2)
+                entry["best"] = min(entry["best"], entry["next"])
+            elif speed > entry["best_speed"] * 1.1:
+                entry["best"] = connections
+                entry["best_speed"] = speed
+                limit = entry["ceiling"] - 1 if entry.get("ceiling") else self.maximum
+                entry["next"] = max(connections, min(limit, connections * 2))
+            elif speed < entry["best_speed"] * 0.9:
+                entry["next"] = entry["best"]
+            else:
+                # About as fast as the best: settle on the cheaper of the two.
+                entry["best"] = min(entry["best"], connections)
+                entry["next"] = entry["best"]
+            entry["updated"] = now
+            self._save()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# Compare metadata fetch latency between the yt-dlp subprocess and the warm in-process engine.
+#
+#   python3 benchmarks/bench_fetch.py URL [URL ...] [-n RUNS]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from engine import FetchError, InfoEngine, inprocess_available  # noqa: E402
+
+
+def run_mode(mode, urls, runs):
+    engine = InfoEngine(mode)
+    samples = []
+    cold = None
+    if mode == "inprocess":
+        started = time.perf_counter()
+        engine.warm_up()
+        cold = time.perf_counter() - started
+    for _ in range(runs):
+        for url in urls:
+            started = time.perf_counter()
+            try:
+                engine.extract_info(url)
+            except FetchError as e:
+                print(f"  {mode}: fetch failed for {url}: {e}", file=sys.stderr)
+                continue
+            samples.append(time.perf_counter() - started)
+    return cold, samples
+
+
+def report(mode, cold, samples):
+    if not samples:
+        print(f"{mode:>10}: no successful fetches")
+        return
+    line = (
+        f"{mode:>10}: n={len(samples)} "
+        f"median={statistics.median(samples) * 1000:.0f} ms "
+        f"min={min(samples) * 1000:.0f} ms "
+        f"max={max(samples) * 1000:.0f} ms"
+    )
+    if cold is not None:
+        line += f" (warm-up {cold * 1000:.0f} ms, paid once)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare metadata fetch latency per engine mode.")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    modes = ["subprocess"]
+    if inprocess_available():
+        modes.append("inprocess")
+    else:
+        print("yt_dlp module not importable; only measuring the subprocess engine", file=sys.stderr)
+
+    for mode in modes:
+        cold, samples = run_mode(mode, args.urls, args.runs)
+        report(mode, cold, samples)
+
+
+if __name__ == "__main__":
+    main()
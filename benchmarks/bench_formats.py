@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# Cost of turning an info JSON's format list into the dropdown and preset lookups:
+# the dict passes apply_info used to make (group_formats, size estimates, auto
+# choices, then scans for best/worst) versus one FormatTable build. Both start from
+# InfoCache's trimmed document, as the app does. Also the memory the kept format
+# data holds, and the resident size of a fresh process keeping each one.
+#
+#   python3 benchmarks/bench_formats.py [INFO_JSON ...]
+#
+# Record large info files with e.g. `yt-dlp -J URL > long.json`. Without files a
+# synthetic YouTube-like info (600 formats with fragment lists) is used.
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from cache import trim_info  # noqa: E402
+from formats import FormatTable, estimated_size  # noqa: E402
+
+
+def synthetic_info(count, fragments):
+    formats = []
+    heights = [144, 240, 360, 480, 720, 1080, 1440, 2160]
+    for i in range(count):
+        audio = i % 5 == 0
+        height = None if audio else heights[i % len(heights)]
+        formats.append({
+            "format_id": f"{100 + i}-{i % 7}",
+            "format_note": "medium" if audio else f"{height}p",
+            "ext": "m4a" if audio else ("mp4", "webm")[i % 2],
+            "protocol": "m3u8_native",
+            "url": f"https://rr1---sn-example.googlevideo.com/videoplayback?itag={100 + i}&" + "x" * 900,
+            "manifest_url": "https://manifest.googlevideo.com/api/manifest/hls_variant/" + "y" * 400,
+            "width": None if audio else height * 16 // 9,
+            "height": height,
+            "fps": None if audio else 30,
+            "vcodec": "none" if audio else ("avc1.64001F", "vp9")[i % 2],
+            "acodec": "mp4a.40.2" if audio else "none",
+            "tbr": 128 + i * 7.5,
+            "abr": 128 + i if audio else None,
+            "filesize_approx": None if i % 3 else 1024 * 1024 * (5 + i),
+            "http_headers": {
+                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0",
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-us,en;q=0.5",
+                "Sec-Fetch-Mode": "navigate",
+            },
+            "fragments": [{"url": f"https://example.com/sq/{n}", "duration": 5.0} for n in range(fragments)],
+        })
+    return {"title": "Synthetic", "duration": 3600, "formats": formats}
+
+
+def legacy_pass(formats, duration):
+    # What apply_info did per fetch before FormatTable.
+    grouped = {}
+    for f in formats:
+        if not f.get("height") or f.get("vcodec") == "none":
+            continue
+        key = (f["height"], f.get("ext") or "unknown")
+        if key not in grouped or (f.get("tbr") or 0) > (grouped[key].get("tbr") or 0):
+            grouped[key] = f
+    keys = sorted(grouped, key=lambda key: (-key[0], key[1]))
+    video_items = [(f"{height}p - {ext}", grouped[(height, ext)]["format_id"]) for height, ext in keys]
+    audio = [f for f in formats if f.get("vcodec") == "none" and f.get("acodec") not in (None, "none")]
+    best_audio = max(audio, key=lambda f: (f.get("abr") or 0, f.get("tbr") or 0)) if audio else None
+    items = video_items + ([("Audio Only", best_audio["format_id"])] if best_audio else [])
+    by_id = {f.get("format_id"): f for f in formats}
+    sizes = [estimated_size(by_id[format_id], duration) for _label, format_id in items]
+    by_height = {}
+    for f in formats:
+        if not f.get("height") or f.get("vcodec") == "none":
+            continue
+        if f["height"] not in by_height or (f.get("tbr") or 0) > (by_height[f["height"]].get("tbr") or 0):
+            by_height[f["height"]] = f
+    choices = [estimated_size(by_height[height], duration) for height in sorted(by_height, reverse=True)]
+    return items, sizes, choices
+
+
+def table_pass(formats, duration):
+    table = FormatTable(formats, duration)
+    items = table.items()
+    sizes = [table.get(format_id).size for _label, format_id in items]
+    return items, sizes, table.choices
+
+
+def best_time(func, formats, duration, rounds):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func(formats, duration)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def retained(build):
+    # Bytes still allocated after build() while its result is alive.
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def resident_bytes():
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def megabytes(value):
+    return f"{value / (1024 * 1024):.2f} MiB"
+
+
+def kept_formats(approach, raw):
+    # What apply_info holds on to after a fetch: InfoCache.put trims the document first.
+    info = trim_info(json.loads(raw))
+    if approach == "dicts":
+        return info["formats"]
+    return FormatTable(info["formats"], info.get("duration"))
+
+
+def measure_resident(approach, path):
+    # Run in a fresh interpreter per approach, so one side's freed arenas do not count for the other.
+    gc.collect()
+    before = resident_bytes()
+    with open(path, "rb") as f:
+        raw = f.read()
+    kept = kept_formats(approach, raw)
+    del raw
+    gc.collect()
+    print(before, resident_bytes(), len(kept.by_id) if approach == "table" else len(kept))
+
+
+def resident_in_child(approach, path):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--resident", approach, path],
+        stdout=subprocess.PIPE, text=True, check=True
+    )
+    before, after, _count = (int(value) for value in result.stdout.split())
+    return before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse info JSON format lists both ways.")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--formats", type=int, default=600)
+    parser.add_argument("--fragments", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--resident", choices=("dicts", "table"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.resident:
+        measure_resident(args.resident, args.files[0])
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.files
+        if not paths:
+            paths = [os.path.join(tmp, "synthetic.json")]
+            with open(paths[0], "w", encoding="utf-8") as f:
+                json.dump(synthetic_info(args.formats, args.fragments), f)
+
+        for path in paths:
+            with open(path, "rb") as f:
+                raw = f.read()
+            started = time.perf_counter()
+            info = json.loads(raw)
+            load_time = time.perf_counter() - started
+            # Both sides start from the trimmed document, as apply_info does.
+            trimmed = trim_info(info)
+            formats = trimmed["formats"]
+            duration = trimmed.get("duration")
+            print(
+                f"{os.path.basename(path)}: {len(raw) / 1024:.0f} KiB JSON, {len(formats)} formats, "
+                f"json.loads {load_time * 1000:.1f} ms"
+            )
+
+            for label, func in (("dict passes", legacy_pass), ("FormatTable", table_pass)):
+                elapsed = best_time(func, formats, duration, args.rounds)
+                print(f"  {label:>12}: {elapsed * 1000:.3f} ms")
+
+            dicts = retained(lambda: kept_formats("dicts", raw))
+            table = retained(lambda: kept_formats("table", raw))
+            print(f"  kept formats: {megabytes(dicts)} as trimmed dicts, {megabytes(table)} as FormatTable")
+            for approach in ("dicts", "table"):
+                before, after = resident_in_child(approach, path)
+                print(
+                    f"  resident ({approach}): {megabytes(after)} after parse + keep, "
+                    f"+{megabytes(after - before)} over the bare interpreter"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Per-line parsing cost of yt-dlp download output: the old stdout regex scraping
+# versus the fixed-field --progress-template lines the engine now requests.
+#
+#   python3 benchmarks/bench_progress.py [--legacy-log FILE] [--json-log FILE]
+#
+# Without log files a synthetic fragment download (2000 progress lines) is replayed.
+# Capture real logs with e.g. `yt-dlp --newline URL > legacy.log` and
+# `yt-dlp <progress_args()> URL > json.log`.
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from progress import PROGRESS_PREFIX, parse_filepath, parse_progress  # noqa: E402
+
+
+def synthetic_logs(count):
+    total = 250 * 1024 * 1024
+    legacy = ["[youtube] abc: Downloading webpage", "[download] Destination: clip [abc].mp4"]
+    structured = []
+    for i in range(1, count + 1):
+        done = total * i // count
+        percent = done * 100 / total
+        legacy.append(
+            f"[download]  {percent:5.1f}% of ~ 250.00MiB at    4.21MiB/s ETA 00:{(count - i) % 60:02d} "
+            f"(frag {i}/{count})"
+        )
+        structured.append(
+            PROGRESS_PREFIX
+            + f"downloading {done} NA {total} 4414504.5 {(count - i) % 60} {i} {count}"
+        )
+    structured.append("[glassdrop-file] /home/user/clip [abc].mp4")
+    return legacy, structured
+
+
+def parse_legacy(lines):
+    # The read loop download_video used before the structured progress feed.
+    updates = 0
+    for line in lines:
+        if "%" in line:
+            try:
+                float(line.split("%")[0].split()[-1])
+                updates += 1
+            except Exception:
+                pass
+        if "[download]" in line:
+            re.search(r"(\d+(?:\.\d+)?)%", line)
+            re.search(r"at\s+([^\s]+)", line)
+            re.search(r"ETA\s+([^\s]+)", line)
+            updates += 1
+        re.search(r"Destination:\s(.+)", line)
+    return updates
+
+
+def parse_structured(lines):
+    updates = 0
+    for line in lines:
+        event = parse_progress(line)
+        if event is not None:
+            event.fraction
+            updates += 1
+            continue
+        parse_filepath(line)
+    return updates
+
+
+def measure(func, lines, rounds):
+    best = None
+    updates = 0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        updates = func(lines)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, updates
+
+
+def read_lines(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay yt-dlp progress logs through both parsers.")
+    parser.add_argument("--legacy-log")
+    parser.add_argument("--json-log")
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    legacy, structured = synthetic_logs(args.lines)
+    if args.legacy_log:
+        legacy = read_lines(args.legacy_log)
+    if args.json_log:
+        structured = read_lines(args.json_log)
+
+    for name, func, lines in (
+        ("regex", parse_legacy, legacy),
+        ("template", parse_structured, structured),
+    ):
+        best, updates = measure(func, lines, args.rounds)
+        per_line = best / max(1, len(lines)) * 1e6
+        print(
+            f"{name:>9}: {len(lines)} lines, {per_line:.2f} us/line, "
+            f"{updates} UI updates ({updates / max(1, len(lines)):.2f} per line)"
+        )
+
+
+if __name__ == "__main__":
+    main()
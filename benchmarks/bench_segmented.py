@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Throughput of the ranged downloader against a local server that caps every connection,
+# the way throttled CDNs do.
+#
+#   python3 benchmarks/bench_segmented.py [--size-mb 32] [--per-connection 4M] [-c 1 2 4 8]
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import segmented  # noqa: E402
+from bandwidth import parse_rate  # noqa: E402
+
+
+def make_handler(payload, per_connection):
+
+    class RangeHandler(BaseHTTPRequestHandler):
+
+        def log_message(self, *_args):
+            pass
+
+        def do_GET(self):
+            start, end = 0, len(payload) - 1
+            header = self.headers.get("Range")
+            if header and header.startswith("bytes="):
+                first, _, last = header[6:].partition("-")
+                start = int(first)
+                end = int(last) if last else end
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+            # Pace each connection to per_connection bytes/s.
+            sent = 0
+            began = time.monotonic()
+            view = memoryview(payload)[start:end + 1]
+            while sent < len(view):
+                chunk = view[sent:sent + 64 * 1024]
+                try:
+                    self.wfile.write(chunk)
+                except OSError:
+                    return
+                sent += len(chunk)
+                ahead = sent / per_connection - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+    return RangeHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ranged download throughput per connection count.")
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--per-connection", default="4M", help="server cap per connection (default 4M)")
+    parser.add_argument("-c", "--connections", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size_mb * 1024 * 1024)
+    per_connection = parse_rate(args.per_connection)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(payload, per_connection))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+
+    print(f"{args.size_mb} MiB, server cap {args.per_connection}/s per connection")
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = os.path.join(tmp, "file.bin")
+        for count in args.connections:
+            started = time.perf_counter()
+            segmented.download(url, dest, connections=count)
+            elapsed = time.perf_counter() - started
+            with open(dest, "rb") as f:
+                intact = f.read() == payload
+            print(
+                f"{count:>3} connections: {elapsed:6.2f} s  "
+                f"{len(payload) / elapsed / 1024 / 1024:7.2f} MiB/s"
+                f"{'' if intact else '  (content mismatch!)'}"
+            )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# Startup cost of the headless batch entry point versus importing the GTK app, and the
+# GUI's own milestones: window presented, first frame painted, URL entry interactive, and
+# deferred startup work (history, queue restore, clipboard, disclaimer) settled.
+# The GUI case needs a display; GLASSDROP_STARTUP_BENCH makes the app quit once settled.
+# Also, without a display, the disk and database work the app opens on first use instead
+# of before the first frame, against a fresh and a filled data directory.
+#
+#   python3 benchmarks/bench_startup.py [-n RUNS]
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+EMPTY_LIST = os.devnull
+MILESTONES = ("present", "first_frame", "interactive", "settled")
+TRACE_RE = re.compile(r"\[glassdrop\] startup\.(\w+): ([0-9.]+) ms")
+
+
+def time_command(cmd, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            return None, (result.stderr.strip().splitlines() or ["failed"])[-1]
+        samples.append(elapsed)
+    return statistics.median(samples), None
+
+
+def time_deferred(runs, rows=5000):
+    # The constructors GlassDrop.__init__ used to run before the window was built.
+    sys.path.insert(0, APP_DIR)
+    from archive import DownloadArchive
+    from history_store import HistoryStore
+    from postprocess import ffmpeg_available
+    from queue_store import QueueStore
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for state in ("fresh", "filled"):
+            if state == "filled":
+                history = HistoryStore(os.path.join(tmp, "history.sqlite3"))
+                for n in range(rows):
+                    history.add(f"https://example.com/v/{n}", f"Video {n}", "720p", f"/tmp/{n}.mp4")
+                history.close()
+                with open(os.path.join(tmp, "archive.txt"), "w", encoding="utf-8") as f:
+                    f.writelines(f"youtube id{n}\n" for n in range(rows))
+            steps = (
+                ("queue store", lambda: QueueStore(os.path.join(tmp, "queue.sqlite3")).close()),
+                ("history store", lambda: HistoryStore(os.path.join(tmp, "history.sqlite3")).close()),
+                ("download archive", lambda: "x" in DownloadArchive(os.path.join(tmp, "archive.txt"))),
+                ("ffmpeg probe", ffmpeg_available),
+            )
+            for name, step in steps:
+                samples = []
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    step()
+                    samples.append(time.perf_counter() - started)
+                results[(state, name)] = statistics.median(samples)
+    return results
+
+
+def time_gui(runs, timeout=30):
+    # Wall time is taken from spawning the process, so it includes interpreter start and imports;
+    # the in-process figure counts from the first line of main.py.
+    env = dict(os.environ, GLASSDROP_DEBUG="1", GLASSDROP_STARTUP_BENCH="1")
+    wall = {name: [] for name in MILESTONES}
+    inproc = {name: [] for name in MILESTONES}
+    for _ in range(runs):
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(APP_DIR, "main.py")],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env
+        )
+        seen = set()
+        try:
+            for line in process.stderr:
+                match = TRACE_RE.search(line)
+                if not match or match.group(1) not in wall:
+                    continue
+                name = match.group(1)
+                wall[name].append(time.perf_counter() - started)
+                inproc[name].append(float(match.group(2)) / 1000)
+                seen.add(name)
+                if name == MILESTONES[-1]:
+                    break
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if MILESTONES[-1] not in seen:
+            return None, f"no startup trace (exit code {process.poll()}; is a display available?)"
+    return (wall, inproc), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batch and GUI startup cost.")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("batch (--batch, empty list)",
+         [sys.executable, os.path.join(APP_DIR, "main.py"), "--batch", EMPTY_LIST]),
+        ("gui module import",
+         [sys.executable, "-c", f"import sys; sys.path.insert(0, {APP_DIR!r}); import gui"]),
+    ]
+    results = {}
+    for name, cmd in cases:
+        median, error = time_command(cmd, args.runs)
+        if median is None:
+            print(f"{name:>28}: unavailable ({error})")
+            continue
+        results[name] = median
+        print(f"{name:>28}: {median * 1000:.0f} ms (median of {args.runs}, includes interpreter start)")
+    if len(results) == 2:
+        batch, gui = results.values()
+        print(f"{'saved by skipping gi':>28}: {(gui - batch) * 1000:.0f} ms")
+
+    deferred = time_deferred(args.runs)
+    for state in ("fresh", "filled"):
+        total = sum(value for (which, _name), value in deferred.items() if which == state)
+        parts = ", ".join(
+            f"{name} {value * 1000:.1f}" for (which, name), value in deferred.items() if which == state
+        )
+        print(f"{'deferred to first use (' + state + ')':>28}: {total * 1000:.1f} ms ({parts} ms)")
+
+    timings, error = time_gui(args.runs)
+    if timings is None:
+        print(f"{'gui startup':>28}: unavailable ({error})")
+        return
+    wall, inproc = timings
+    for name in MILESTONES:
+        print(
+            f"{'gui ' + name:>28}: {statistics.median(wall[name]) * 1000:.0f} ms from spawn, "
+            f"{statistics.median(inproc[name]) * 1000:.0f} ms in-process (median of {args.runs})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-exec python3 /app/share/glassdrop/app/main.py
+exec python3 /app/share/glassdrop/app/main.py "$@"
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Error tails as yt-dlp prints them, and the retry class downloader.classify_error gives each.
+#
+#   python3 -m unittest discover tests
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from downloader import classify_error  # noqa: E402
+
+
+class ClassifyErrorTest(unittest.TestCase):
+
+    def test_fragment_lost_after_server_error_is_transient(self):
+        tail = [
+            "[download] Got error: HTTP Error 503: Service Unavailable. Retrying fragment 12 (1/10)...",
+            "[download] Got error: HTTP Error 503: Service Unavailable. Retrying fragment 12 (10/10)...",
+            "ERROR: fragment 12 not found, unable to continue",
+        ]
+        self.assertEqual(classify_error(tail), "transient")
+
+    def test_fragment_lost_without_retry_lines_is_transient(self):
+        self.assertEqual(classify_error(["ERROR: fragment 3 not found, unable to continue"]), "transient")
+
+    def test_dns_failure_is_transient(self):
+        tail = [
+            "ERROR: [generic] Unable to download webpage: <urlopen error [Errno -2] "
+            "Name or service not known> (caused by URLError(gaierror(-2, 'Name or service not known')))",
+        ]
+        self.assertEqual(classify_error(tail), "transient")
+
+    def test_throttled_retries_before_fragment_loss(self):
+        tail = [
+            "[download] Got error: HTTP Error 429: Too Many Requests. Retrying fragment 4 (3/10)...",
+            "ERROR: fragment 4 not found, unable to continue",
+        ]
+        self.assertEqual(classify_error(tail), "throttled")
+
+    def test_forbidden_before_expiry_is_permanent(self):
+        tail = ["ERROR: unable to download video data: HTTP Error 403: Forbidden"]
+        self.assertEqual(classify_error(tail, expires_at=time.time() + 3600), "permanent")
+        self.assertEqual(classify_error(tail, expires_at=time.time() - 60), "expired")
+
+    def test_title_text_does_not_count(self):
+        tail = [
+            "[download] Destination: Connection reset (live).mp4",
+            "ERROR: [youtube] abc: Private video. Sign in if you've been granted access",
+        ]
+        self.assertEqual(classify_error(tail), "permanent")
+
+
+if __name__ == "__main__":
+    unittest.main()